@@ -0,0 +1,102 @@
+"""
+Benchmark GET /projects serialization: ORM + pydantic vs Core rows + dicts + orjson.
+Uses a throwaway SQLite database; run from the project root:
+
+    python -m backend.bench_project_listing [projects] [page_size]
+
+Both paths page through every project with the keyset cursor, like the UI does.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.database import AsyncSessionLocal, engine, ensure_schema
+from backend.models.project import Project
+from backend.services.project_cache import project_cache
+from backend.services.project_service import ProjectService
+
+ROUNDS = 5
+
+
+def populate(count: int):
+    ensure_schema()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO projects (title, location, location_address, location_latitude, "
+            "location_longitude, notes, completed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(f"Project {i}", "Denver, CO", f"{i} Main St", 39.7 + i * 1e-4, -104.9, "Level 2 drywall", i % 3 == 0)
+             for i in range(count)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO floor_plan_files (project_id, filename, file_type, file_path, file_size, sha256) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(i // 2 + 1, f"plan_{i}.pdf", "pdf", f"uploads/floor_plans/{i:064x}", 1024 * i, f"{i:064x}")
+             for i in range(count * 2)],
+        )
+
+
+async def legacy_listing(limit: int) -> List[bytes]:
+    """What the handler did before: ORM objects -> Project models -> response_model validation -> JSON"""
+    adapter = TypeAdapter(List[Project])
+    pages, after_id = [], None
+    async with AsyncSessionLocal() as db:
+        service = ProjectService(db)
+        while True:
+            projects = await service.list_projects(after_id=after_id, limit=limit)
+            pages.append(adapter.dump_json(adapter.validate_python(projects)))
+            if len(projects) < limit:
+                return pages
+            after_id = projects[-1].id
+
+
+async def fast_listing(limit: int) -> List[bytes]:
+    """Core rows -> dicts -> orjson (cache cleared so every round does the full work)"""
+    project_cache._list_version += 1
+    pages, after_id = [], None
+    async with AsyncSessionLocal() as db:
+        service = ProjectService(db)
+        while True:
+            page = await service.list_projects_cached(after_id=after_id, limit=limit)
+            pages.append(page.body)
+            if page.next_cursor is None:
+                return pages
+            after_id = int(page.next_cursor)
+
+
+async def measure(name: str, fn, limit: int) -> float:
+    await fn(limit)  # Warm up
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        await fn(limit)
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:8s} {best * 1000:8.1f} ms")
+    return best
+
+
+async def main(count: int, limit: int):
+    populate(count)
+    print(f"{count} projects, 2 floor plans each, page of {limit} (best of {ROUNDS})")
+    legacy_pages, fast_pages = await legacy_listing(limit), await fast_listing(limit)
+    assert [p for page in legacy_pages for p in json.loads(page)] == \
+        [p for page in fast_pages for p in json.loads(page)], "paths disagree"
+    legacy = await measure("legacy", legacy_listing, limit)
+    fast = await measure("fast", fast_listing, limit)
+    print(f"speedup  {legacy / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    asyncio.run(main(count, limit))
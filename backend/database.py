@@ -1,35 +1,101 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from typing import Callable, List
 
 # SQLite database URL (for development)
 # This will create a file called "drywall_robot.db" in the project root
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./drywall_robot.db")
 
+
+def _to_async_url(url: str) -> str:
+    """Same database through an asyncio driver (aiosqlite for SQLite)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+# Async URL used by the API; override it for databases other than SQLite
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _to_async_url(DATABASE_URL))
+
 # Create engine
 # check_same_thread=False is needed for SQLite with FastAPI
+# The sync engine is kept for scripts (init_db.py) and background threads
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
-# Create session factory
+# Async engine for request handlers, so queries never block the event loop
+# that also runs the simulator and telemetry
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets the history writer's bulk inserts run alongside API reads;
+    # NORMAL sync is durable across app crashes and much cheaper per commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for all database models
 Base = declarative_base()
 
-# Dependency function for FastAPI routes
-# This will be used with Depends(get_db) in route handlers
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+# Extra schema steps that create_all cannot express (virtual tables, triggers);
+# each gets the connection and must be idempotent
+SchemaHook = Callable[..., None]
+schema_hooks: List[SchemaHook] = []
+
+
+def schema_hook(fn: SchemaHook) -> SchemaHook:
+    """Decorator: run fn(conn) at the end of every ensure_schema()"""
+    schema_hooks.append(fn)
+    return fn
 
 
+def ensure_schema(bind=engine):
+    """Create missing tables, plus columns and indexes added to tables that already exist
 
+    create_all never alters an existing table, so databases created before a
+    column or index was declared would never get it. Added columns must be
+    nullable (or have a server default) for ALTER TABLE to accept them.
+    """
+    Base.metadata.create_all(bind=bind)
+    existing = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            present = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    )
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    with bind.begin() as conn:
+        for hook in schema_hooks:
+            hook(conn)
 
+
+# Dependency function for FastAPI routes
+# This will be used with Depends(get_db) in route handlers
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,13 +2,13 @@
 Initialize the database by creating all tables.
 Run this script once to set up your database.
 """
-from backend.database import engine, Base
+from backend.database import ensure_schema
 from backend.models import database_models
 
 def init_db():
     """Create all database tables"""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
     print("Database tables created successfully!")
     print("Database file: drywall_robot.db")
 
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes import robot_routes, commands, projects, users, auth
-from backend.database import engine, Base
+from backend.routes import robot_routes, commands, projects, floor_plans, jobs, users, auth, telemetry, metrics
+from backend.database import ensure_schema
 from backend.models import database_models
+from backend.services.fleet_registry import fleet_registry
+from backend.protocol.tcp_gateway import command_gateway
+from backend.services.history_writer import history_writer
+from backend.services.job_queue import job_queue
 
 app = FastAPI(title="Drywall Robot API", version="0.1.0")
 
@@ -18,19 +22,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Conditional GETs, pagination for /projects and ranged floor-plan downloads
+    expose_headers=["ETag", "X-Next-Cursor", "Accept-Ranges", "Content-Range", "Content-Length"],
 )
 
 # Initialize database tables on startup
 @app.on_event("startup")
 async def startup_event():
-    Base.metadata.create_all(bind=engine)
+    ensure_schema()
+    history_writer.start()
+    await job_queue.start()
+    await fleet_registry.start()
+    try:
+        await command_gateway.start()
+    except OSError as e:
+        # Keep the HTTP API up even if the TCP port is taken (e.g. by a --reload sibling)
+        print(f"TCP command gateway not started: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await command_gateway.stop()
+    await fleet_registry.stop()
+    await job_queue.stop()
+    # Flush whatever telemetry and command history is still buffered
+    history_writer.stop()
 
 # Include Routers
 app.include_router(robot_routes.router)
+app.include_router(robot_routes.fleet_router)
 app.include_router(commands.router)
 app.include_router(projects.router)
+app.include_router(floor_plans.router)
+app.include_router(jobs.router)
 app.include_router(users.router)
 app.include_router(auth.router)
+app.include_router(telemetry.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
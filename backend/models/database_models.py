@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Float, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from backend.database import Base
+from backend.database import Base, schema_hook
 
 
 class User(Base):
@@ -36,7 +36,7 @@ class Project(Base):
     location_longitude = Column(Float, nullable=True)  # From location_data.longitude
     notes = Column(Text, nullable=True)
     completed = Column(Boolean, default=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Link to owner
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Link to owner
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -45,22 +45,162 @@ class Project(Base):
     floor_plan_files = relationship("FloorPlanFile", back_populates="project", cascade="all, delete-orphan")
 
 
+# Full-text index over project text (SQLite FTS5, external content: no text is stored twice).
+# Triggers keep it in sync with every write to projects, whichever code path makes it.
+# prefix='2 3' adds prefix indexes so type-ahead queries ("den*") stay fast.
+PROJECT_FTS_COLUMNS = ("title", "location", "location_address", "notes")
+
+_PROJECT_FTS_DDL = f"""
+CREATE VIRTUAL TABLE projects_fts USING fts5(
+    {", ".join(PROJECT_FTS_COLUMNS)},
+    content='projects', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)"""
+
+
+def _project_fts_triggers():
+    columns = ", ".join(PROJECT_FTS_COLUMNS)
+    new = ", ".join(f"new.{c}" for c in PROJECT_FTS_COLUMNS)
+    old = ", ".join(f"old.{c}" for c in PROJECT_FTS_COLUMNS)
+    delete_old = (f"INSERT INTO projects_fts(projects_fts, rowid, {columns}) "
+                  f"VALUES ('delete', old.id, {old});")
+    insert_new = f"INSERT INTO projects_fts(rowid, {columns}) VALUES (new.id, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF {columns} ON projects "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+@schema_hook
+def ensure_project_fts(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_fts'"
+    ).first()
+    if not exists:
+        conn.exec_driver_sql(_PROJECT_FTS_DDL)
+        # Index the projects that existed before the table did
+        conn.exec_driver_sql("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')")
+    for ddl in _project_fts_triggers():
+        conn.exec_driver_sql(ddl)
+
+
+# Spatial index over project coordinates (SQLite R*Tree). Each located project is a
+# zero-size box; R*Tree stores 32-bit floats rounded outward, so it only preselects
+# candidates and exact distances come from the projects columns.
+_PROJECT_RTREE_DDL = """
+CREATE VIRTUAL TABLE projects_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)"""
+
+_PROJECT_RTREE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS projects_rtree_ai AFTER INSERT ON projects
+    WHEN new.location_latitude IS NOT NULL AND new.location_longitude IS NOT NULL BEGIN
+        INSERT INTO projects_rtree VALUES (new.id, new.location_latitude, new.location_latitude,
+                                           new.location_longitude, new.location_longitude);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_rtree_ad AFTER DELETE ON projects BEGIN
+        DELETE FROM projects_rtree WHERE id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_rtree_au
+    AFTER UPDATE OF location_latitude, location_longitude ON projects BEGIN
+        DELETE FROM projects_rtree WHERE id = old.id;
+        INSERT INTO projects_rtree
+        SELECT new.id, new.location_latitude, new.location_latitude,
+               new.location_longitude, new.location_longitude
+        WHERE new.location_latitude IS NOT NULL AND new.location_longitude IS NOT NULL;
+    END""",
+]
+
+
+@schema_hook
+def ensure_project_rtree(conn):
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'projects_rtree'"
+    ).first()
+    if not exists:
+        conn.exec_driver_sql(_PROJECT_RTREE_DDL)
+        conn.exec_driver_sql(
+            "INSERT INTO projects_rtree SELECT id, location_latitude, location_latitude, "
+            "location_longitude, location_longitude FROM projects "
+            "WHERE location_latitude IS NOT NULL AND location_longitude IS NOT NULL"
+        )
+    for ddl in _PROJECT_RTREE_TRIGGERS:
+        conn.exec_driver_sql(ddl)
+
+
 class FloorPlanFile(Base):
     """Database model for floor plan files"""
     __tablename__ = "floor_plan_files"
     
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     filename = Column(String, nullable=False)
     file_type = Column(String, nullable=False)  # "dwg" or "pdf"
     file_path = Column(String, nullable=False)  # Path on filesystem
     file_size = Column(Integer, nullable=True)  # Size in bytes
+    sha256 = Column(String(64), nullable=True, index=True)  # Content hash; also the storage key
+    derivatives_status = Column(String, nullable=True)  # pending/ready/failed/unsupported
+    page_count = Column(Integer, nullable=True)
+    page_meta = Column(Text, nullable=True)  # JSON list of per-page size and tile grid
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     project = relationship("Project", back_populates="floor_plan_files")
 
 
+class TelemetrySample(Base):
+    """Database model for persisted robot telemetry (written in bulk by HistoryWriter)"""
+    __tablename__ = "telemetry_samples"
+    
+    id = Column(Integer, primary_key=True)
+    robot_id = Column(String, nullable=False)
+    recorded_at = Column(Float, nullable=False)  # Epoch seconds
+    x = Column(Float, nullable=False)
+    y = Column(Float, nullable=False)
+    theta = Column(Float, nullable=False)
+    battery_level = Column(Float, nullable=False)
+    lift_height = Column(Float, nullable=False)
+    status = Column(String, nullable=False)
+    
+    __table_args__ = (Index("ix_telemetry_samples_robot_time", "robot_id", "recorded_at"),)
 
 
+class CommandEvent(Base):
+    """Database model for executed robot commands (written in bulk by HistoryWriter)"""
+    __tablename__ = "command_events"
+    
+    id = Column(Integer, primary_key=True)
+    robot_id = Column(String, nullable=False)
+    recorded_at = Column(Float, nullable=False)  # Epoch seconds
+    command = Column(String, nullable=False)
+    args = Column(Text, nullable=True)  # JSON-encoded command arguments
+    accepted = Column(Boolean, nullable=False)
+    latency_ms = Column(Float, nullable=True)  # Submit to actuation
+    
+    __table_args__ = (Index("ix_command_events_robot_time", "robot_id", "recorded_at"),)
+
 
+class Job(Base):
+    """Database model for background jobs (see services/job_queue.py)"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True)
+    type = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued/running/succeeded/failed
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    payload = Column(Text, nullable=True)  # JSON
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)  # 0..1
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(Float, nullable=False)  # Epoch seconds; pushed back on retry
+    created_at = Column(Float, nullable=False)
+    started_at = Column(Float, nullable=True)
+    finished_at = Column(Float, nullable=True)
+    
+    __table_args__ = (Index("ix_jobs_status_priority", "status", "priority", "run_after"),)
@@ -0,0 +1,19 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class Job(BaseModel):
+    id: int
+    type: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    priority: int
+    progress: float  # 0..1
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None  # Last failure, kept while retrying
+    created_at: float  # Epoch seconds
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    run_after: float  # Next attempt not before this time
@@ -10,10 +10,15 @@ class LocationData(BaseModel):
 
 
 class FloorPlanFile(BaseModel):
+    id: Optional[int] = None  # Set on stored files; used by /floor-plans/{id}/download
     filename: str
     file_type: str  # "dwg" or "pdf"
     file_path: str
     uploaded_at: Optional[str] = None
+    file_size: Optional[int] = None
+    sha256: Optional[str] = None
+    derivatives_status: Optional[str] = None  # Previews: pending/ready/failed/unsupported
+    page_count: Optional[int] = None
 
 
 class ProjectBase(BaseModel):
@@ -29,6 +34,11 @@ class ProjectCreate(ProjectBase):
     pass
 
 
+class ProjectImport(ProjectCreate):
+    """One line of a bulk import; GET /projects/export lines are accepted as-is"""
+    completed: bool = False
+
+
 class ProjectUpdate(BaseModel):
     title: Optional[str] = None
     location: Optional[str] = None
@@ -43,3 +53,7 @@ class Project(ProjectBase):
     id: int
     completed: bool = False
 
+
+
+class NearbyProject(Project):
+    distance_km: float
@@ -5,7 +5,10 @@ from typing import Optional
 class RobotStatus(str, Enum):
     IDLE = "IDLE"
     MOVING = "MOVING"
+    TURNING = "TURNING"
+    LIFT_MOVING = "LIFT_MOVING"
     ERROR = "ERROR"
+    EMERGENCY_STOP = "EMERGENCY_STOP"
     CHARGING = "CHARGING"
 
 class RobotPosition(BaseModel):
@@ -17,4 +20,7 @@ class RobotState(BaseModel):
     status: RobotStatus
     position: RobotPosition
     battery_level: float
+    speed: float = 0.0  # Commanded drive speed
+    lift_height: float = 0.0  # cm, updated every tick while the lift travels
+    lift_target: float = 0.0
     error_message: Optional[str] = None
@@ -30,3 +30,9 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+
+
+class LoginResponse(User):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
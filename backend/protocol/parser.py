@@ -0,0 +1,150 @@
+"""
+Parser for the line-based robot command protocol.
+
+    AUTH <session token>
+    MOVE_FORWARD:0.75
+    SET_LIFT:40
+    {"command": "MOVE_FORWARD", "speed": 0.5}
+
+Parsing works directly on the connection's receive buffer: command names are
+matched in place with bytearray.startswith, so no str is built per command.
+Only the numeric argument is sliced out for float().
+"""
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+
+# Opcodes
+MOVE_FORWARD = 1
+MOVE_BACK = 2
+TURN_LEFT = 3
+TURN_RIGHT = 4
+STOP = 5
+SET_LIFT = 6
+LIFT_UP = 7
+LIFT_DOWN = 8
+GET_STATUS = 9
+EMERGENCY_STOP = 10
+PING = 11
+AUTH = 12
+INVALID = 0
+
+COMMAND_NAMES: Dict[str, int] = {
+    "MOVE_FORWARD": MOVE_FORWARD,
+    "MOVE_BACK": MOVE_BACK,
+    "TURN_LEFT": TURN_LEFT,
+    "TURN_RIGHT": TURN_RIGHT,
+    "STOP": STOP,
+    "SET_LIFT": SET_LIFT,
+    "LIFT_UP": LIFT_UP,
+    "LIFT_DOWN": LIFT_DOWN,
+    "GET_STATUS": GET_STATUS,
+    "EMERGENCY_STOP": EMERGENCY_STOP,
+    "PING": PING,
+    "AUTH": AUTH,
+}
+
+# Commands that must carry a value after the colon
+NEEDS_VALUE = {MOVE_FORWARD, MOVE_BACK, TURN_LEFT, TURN_RIGHT, SET_LIFT}
+
+# Keys accepted for the value in the JSON variant
+JSON_VALUE_KEYS = ("speed", "cm", "height_cm", "value")
+
+# Lines longer than this without a newline are treated as garbage
+MAX_LINE_BYTES = 4096
+
+# (opcode, value, text); text is the robot_id of the JSON variant, or the token of AUTH
+Command = Tuple[int, Optional[float], Optional[str]]
+
+_AUTH_PREFIX = b"AUTH "
+
+# Candidate names bucketed by their first byte, so a line is compared against
+# one or two names instead of all of them
+_BY_FIRST_BYTE: Dict[int, List[Tuple[bytes, int]]] = {}
+for _name, _opcode in COMMAND_NAMES.items():
+    _encoded = _name.encode()
+    _BY_FIRST_BYTE.setdefault(_encoded[0], []).append((_encoded, _opcode))
+
+_COLON = 0x3A
+_OPEN_BRACE = 0x7B
+_CR = 0x0D
+
+
+def parse_line(buffer: bytearray, start: int, end: int) -> Command:
+    """Parse one command occupying buffer[start:end] (no newline)"""
+    if buffer[start] == _OPEN_BRACE:
+        return _parse_json(bytes(buffer[start:end]))
+    if buffer.startswith(_AUTH_PREFIX, start, end):
+        token = bytes(buffer[start + len(_AUTH_PREFIX):end]).strip()
+        return (AUTH, None, token.decode("ascii", "replace")) if token else (INVALID, None, None)
+
+    colon = buffer.find(b":", start, end)
+    name_end = colon if colon >= 0 else end
+    opcode = INVALID
+    for name, candidate in _BY_FIRST_BYTE.get(buffer[start], ()):
+        if name_end - start == len(name) and buffer.startswith(name, start):
+            opcode = candidate
+            break
+    if opcode == INVALID:
+        return (INVALID, None, None)
+
+    value = None
+    if colon >= 0:
+        try:
+            value = float(buffer[colon + 1:end])
+        except ValueError:
+            return (INVALID, None, None)
+        if not math.isfinite(value):
+            return (INVALID, None, None)
+    if opcode in NEEDS_VALUE and value is None:
+        return (INVALID, None, None)
+    return (opcode, value, None)
+
+
+def _parse_json(line: bytes) -> Command:
+    try:
+        message = json.loads(line)
+        name = message.get("command") or message.get("cmd")
+    except (ValueError, AttributeError):
+        return (INVALID, None, None)
+
+    opcode = COMMAND_NAMES.get(name, INVALID) if isinstance(name, str) else INVALID
+    if opcode == AUTH:
+        token = message.get("token")
+        return (AUTH, None, token) if isinstance(token, str) and token else (INVALID, None, None)
+    value = None
+    for key in JSON_VALUE_KEYS:
+        if key in message:
+            try:
+                value = float(message[key])
+            except (TypeError, ValueError):
+                return (INVALID, None, None)
+            if not math.isfinite(value):
+                return (INVALID, None, None)
+            break
+    if opcode in NEEDS_VALUE and value is None:
+        return (INVALID, None, None)
+    robot_id = message.get("robot_id")
+    return (opcode, value, str(robot_id) if robot_id is not None else None)
+
+
+def parse_commands(buffer: bytearray) -> Tuple[List[Command], int]:
+    """Parse every complete line in buffer
+
+    Returns the commands and the number of bytes consumed; the caller keeps
+    the unconsumed tail for the next read. Blank lines are skipped.
+    """
+    commands: List[Command] = []
+    pos = 0
+    find = buffer.find
+    while True:
+        newline = find(b"\n", pos)
+        if newline < 0:
+            break
+        end = newline
+        if end > pos and buffer[end - 1] == _CR:
+            end -= 1
+        if end > pos:
+            commands.append(parse_line(buffer, pos, end))
+        pos = newline + 1
+    return commands, pos
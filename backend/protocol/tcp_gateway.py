@@ -0,0 +1,167 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from backend.protocol import parser
+from backend.protocol.parser import Command
+from backend.services.auth_tokens import token_claims
+from backend.services.fleet_registry import DEFAULT_ROBOT_ID, FleetRegistry, fleet_registry
+from backend.services.robot_service import RobotService
+from backend.services.user_service import get_cached_user
+
+GATEWAY_HOST = os.getenv("TCP_GATEWAY_HOST", "0.0.0.0")
+GATEWAY_PORT = int(os.getenv("TCP_GATEWAY_PORT", "9000"))
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# Lift step used by LIFT_UP / LIFT_DOWN, which carry no height
+LIFT_STEP_CM = 10.0
+
+OK = b"OK\n"
+PONG = b"PONG\n"
+ERR_INVALID = b"ERR INVALID_COMMAND\n"
+ERR_REJECTED = b"ERR REJECTED\n"
+ERR_UNKNOWN_ROBOT = b"ERR UNKNOWN_ROBOT\n"
+ERR_LINE_TOO_LONG = b"ERR LINE_TOO_LONG\n"
+ERR_UNAUTHORIZED = b"ERR UNAUTHORIZED\n"
+ERR_SESSION_EXPIRED = b"ERR SESSION_EXPIRED\n"
+
+# Like the HTTP routes: motion needs a session token (AUTH <token> once per
+# connection); STOP, EMERGENCY_STOP, GET_STATUS and PING stay open so anyone can halt a robot.
+# The session is checked again (expiry, then the user through user_cache) before every
+# read that carries motion; an expired or revoked session closes the connection.
+MOTION_OPCODES = {
+    parser.MOVE_FORWARD, parser.MOVE_BACK, parser.TURN_LEFT, parser.TURN_RIGHT,
+    parser.SET_LIFT, parser.LIFT_UP, parser.LIFT_DOWN,
+}
+
+
+class CommandGateway:
+    """asyncio TCP server speaking the text/JSON command protocol
+
+    Clients may pipeline: every complete line in a read is parsed and executed
+    in order, and all replies for that read go out in a single write. Each
+    command gets exactly one reply line (OK, PONG, ERR ..., or status JSON).
+    """
+
+    def __init__(self, registry: FleetRegistry, robot_id: str = DEFAULT_ROBOT_ID):
+        self.registry = registry
+        self.robot_id = robot_id
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.connections = 0
+        self.commands_handled = 0
+        self.sessions_closed = 0
+
+    async def start(self, host: str = GATEWAY_HOST, port: int = GATEWAY_PORT):
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        buffer = bytearray()
+        session: Optional[Tuple[int, float]] = None  # (user id, token expiry) from a valid AUTH line
+        closing: Optional[bytes] = None  # Final reply before hanging up on a dead session
+        try:
+            while True:
+                chunk = await reader.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                buffer += chunk
+                commands, consumed = parser.parse_commands(buffer)
+                if consumed:
+                    del buffer[:consumed]
+                elif len(buffer) > parser.MAX_LINE_BYTES:
+                    writer.write(ERR_LINE_TOO_LONG)
+                    break
+
+                replies = bytearray()
+                checked = False  # Session re-checked for this read
+                for command in commands:
+                    if command[0] == parser.AUTH:
+                        session = await _open_session(command[2])
+                        replies += OK if session is not None else ERR_UNAUTHORIZED
+                        checked = True
+                        continue
+                    if command[0] in MOTION_OPCODES and session is not None and not checked:
+                        closing = await _session_error(session)
+                        if closing is not None:
+                            break
+                        checked = True
+                    replies += self.execute(command, authenticated=session is not None)
+                self.commands_handled += len(commands)
+                writer.write(replies)
+                if closing is not None:
+                    writer.write(closing)
+                    self.sessions_closed += 1
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def execute(self, command: Command, authenticated: bool = False) -> bytes:
+        """Run one parsed command against its robot and return the reply line"""
+        opcode, value, robot_id = command
+        if opcode == parser.INVALID:
+            return ERR_INVALID
+        if opcode == parser.PING:
+            return PONG
+        if opcode in MOTION_OPCODES and not authenticated:
+            return ERR_UNAUTHORIZED
+
+        robot = self.registry.get(robot_id or self.robot_id)
+        if robot is None:
+            return ERR_UNKNOWN_ROBOT
+        if opcode == parser.GET_STATUS:
+            return robot.get_state().model_dump_json().encode() + b"\n"
+        return OK if _HANDLERS[opcode](robot, value) else ERR_REJECTED
+
+
+async def _open_session(token: str) -> Optional[Tuple[int, float]]:
+    """(user id, token expiry) for a valid token of an active user"""
+    claims = token_claims(token)
+    if claims is None:
+        return None
+    user = await get_cached_user(claims[0])
+    return claims if user is not None and user.is_active else None
+
+
+async def _session_error(session: Tuple[int, float]) -> Optional[bytes]:
+    """Reply to close the connection with, or None while the session is still good"""
+    user_id, expires_at = session
+    if expires_at < time.time():
+        return ERR_SESSION_EXPIRED
+    user = await get_cached_user(user_id)
+    if user is None or not user.is_active:
+        return ERR_UNAUTHORIZED
+    return None
+
+
+# Opcode -> handler(robot, value) returning whether the robot accepted the command.
+# Everything goes through the robot's scheduler, so STOP/EMERGENCY_STOP preempt
+# queued motion and pipelined MOVE_* bursts coalesce.
+_HANDLERS: Dict[int, Callable[[RobotService, Optional[float]], bool]] = {
+    parser.MOVE_FORWARD: lambda robot, value: robot.scheduler.submit("move", value),
+    parser.MOVE_BACK: lambda robot, value: robot.scheduler.submit("move", -value),
+    parser.TURN_LEFT: lambda robot, value: robot.scheduler.submit("turn", value, "left"),
+    parser.TURN_RIGHT: lambda robot, value: robot.scheduler.submit("turn", value, "right"),
+    parser.STOP: lambda robot, value: robot.scheduler.submit("stop"),
+    parser.EMERGENCY_STOP: lambda robot, value: robot.scheduler.submit("emergency_stop"),
+    parser.SET_LIFT: lambda robot, value: robot.scheduler.submit("lift", value, "set"),
+    parser.LIFT_UP: lambda robot, value: robot.scheduler.submit("lift", LIFT_STEP_CM, "up"),
+    parser.LIFT_DOWN: lambda robot, value: robot.scheduler.submit("lift", LIFT_STEP_CM, "down"),
+}
+
+
+# Gateway started alongside the FastAPI app
+command_gateway = CommandGateway(fleet_registry)
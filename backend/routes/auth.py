@@ -1,30 +1,53 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 
 from backend.database import get_db
-from backend.models.user import User, UserCreate
-from backend.services.user_service import UserService
+from backend.models.user import LoginResponse, User, UserCreate
+from backend.services.auth_tokens import TOKEN_TTL_S, issue_token, verify_token
+from backend.services.user_service import UserService, get_cached_user, user_cache
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def require_user(authorization: Optional[str] = Header(None)) -> User:
+    """Resolve the Bearer token to a user; the database is only hit on a cache miss"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated",
+                            headers={"WWW-Authenticate": "Bearer"})
+    user_id = verify_token(token)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+    user = await get_cached_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found",
+                            headers={"WWW-Authenticate": "Bearer"})
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="User is inactive")
+    return user
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
 
 
-@router.post("/register", response_model=User, status_code=201)
+@router.post("/register", response_model=LoginResponse, status_code=201)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Register a new user account"""
+    """Register a new user account and issue a session token, so the UI can log straight in"""
     user_service = UserService(db)
     
     # Check if username already exists
-    existing_user = user_service.get_user_by_username(user_data.username)
+    existing_user = await user_service.get_user_by_username(user_data.username)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already taken")
     
@@ -57,11 +80,10 @@ async def register(
     
     # Create the user
     try:
-        new_user = user_service.create_user(user_data)
-        return new_user
+        new_user = await user_service.create_user(user_data)
     except ValueError as e:
         # Handle password validation errors (including bcrypt 72-byte limit)
-        db.rollback()
+        await db.rollback()
         error_msg = str(e)
         # Check if it's specifically the bcrypt 72-byte error (be more specific)
         if ("72" in error_msg and ("byte" in error_msg.lower() or "character" in error_msg.lower())) or "truncate" in error_msg.lower():
@@ -72,7 +94,7 @@ async def register(
         raise HTTPException(status_code=400, detail=error_msg)
     except IntegrityError as e:
         # Handle unique constraint violations from database
-        db.rollback()
+        await db.rollback()
         error_msg = str(e.orig) if hasattr(e, 'orig') else str(e)
         if "username" in error_msg.lower():
             raise HTTPException(status_code=400, detail="Username already taken")
@@ -81,7 +103,7 @@ async def register(
         else:
             raise HTTPException(status_code=400, detail="Username or email already taken")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = str(e)
         # Check for bcrypt 72-byte limit error (be more specific to avoid false positives)
         if (("72" in error_msg and ("byte" in error_msg.lower() or "character" in error_msg.lower())) or 
@@ -97,16 +119,28 @@ async def register(
         # For other errors, provide a generic message to avoid exposing internal details
         raise HTTPException(status_code=500, detail="Failed to create account. Please try again.")
 
+    user_cache.set(new_user.id, new_user)
+    return LoginResponse(
+        **new_user.model_dump(),
+        access_token=issue_token(new_user.id),
+        expires_in=TOKEN_TTL_S,
+    )
+
 
-@router.post("/login", response_model=User)
+@router.post("/login", response_model=LoginResponse)
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Login endpoint - verifies username and password"""
+    """Login endpoint - verifies username and password and issues a session token"""
     user_service = UserService(db)
-    user = user_service.verify_password(credentials.username, credentials.password)
+    user = await user_service.verify_password(credentials.username, credentials.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
-    return user
+    user_cache.set(user.id, user)
+    return LoginResponse(
+        **user.model_dump(),
+        access_token=issue_token(user.id),
+        expires_in=TOKEN_TTL_S,
+    )
 
@@ -0,0 +1,139 @@
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response, Depends
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.database import get_db
+from backend.models.project import FloorPlanFile
+from backend.services.floor_plan_derivatives import READY, thumbnail_path, tile_path
+from backend.services.project_service import ProjectService
+
+router = APIRouter(prefix="/floor-plans", tags=["floor-plans"])
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "dwg": "image/vnd.dwg",
+}
+
+# Stored files never change (the path is the content hash), so clients may keep them
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+# For URLs whose file can change (the project/position route): revalidate with the ETag every time
+REVALIDATE = "private, no-cache"
+
+# Chunk size when the server has no zero-copy path (fewer, larger reads than the 64 KiB default)
+CHUNK_BYTES = 1024 * 1024
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag
+
+    Handles "*", comma-separated lists and W/ tags; If-None-Match uses the
+    weak comparison, so W/"x" matches "x" and the other way round.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def floor_plan_response(request: Request, file_info: FloorPlanFile,
+                        cache_control: str = CACHE_CONTROL) -> Response:
+    """Serve a stored floor plan with Range/If-Range, ETag and caching headers
+
+    cache_control defaults to immutable, which is only right for URLs naming
+    one stored file (/floor-plans/{file_id}); others pass REVALIDATE.
+
+    FileResponse handles Range, multipart ranges and If-Range, and hands the
+    path to the server (http.response.pathsend) when the server supports it
+    for a zero-copy send; otherwise it streams the file in chunks.
+    """
+    file_path = Path(file_info.file_path)
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found on server")
+
+    headers = {"Cache-Control": cache_control}
+    if file_info.sha256:
+        # Content hash as a strong validator, stable across restarts and copies
+        headers["ETag"] = f'"{file_info.sha256}"'
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    response = FileResponse(
+        path=str(file_path),
+        filename=file_info.filename,
+        media_type=MEDIA_TYPES.get(file_info.file_type, "application/octet-stream"),
+        headers=headers,
+        content_disposition_type="inline" if file_info.file_type == "pdf" else "attachment",
+    )
+    response.chunk_size = CHUNK_BYTES
+    return response
+
+
+@router.get("/{file_id}/download")
+async def download_floor_plan(
+    file_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Download a floor plan by its id; supports Range requests for partial fetches"""
+    project_service = ProjectService(db)
+    file_info = await project_service.get_floor_plan_file(file_id)
+    if not file_info:
+        raise HTTPException(status_code=404, detail="Floor plan file not found")
+    return floor_plan_response(request, file_info)
+
+
+async def _ready_floor_plan(file_id: int, db: AsyncSession) -> FloorPlanFile:
+    file_info = await ProjectService(db).get_floor_plan_file(file_id)
+    if not file_info:
+        raise HTTPException(status_code=404, detail="Floor plan file not found")
+    if file_info.derivatives_status != READY:
+        raise HTTPException(status_code=404, detail=f"No previews (status: {file_info.derivatives_status})")
+    return file_info
+
+
+def _derivative_response(request: Request, path: Path, etag: str) -> Response:
+    # Derivatives are as immutable as the content hash they are stored under
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Preview not found")
+    return FileResponse(path=str(path), media_type="image/png", headers=headers)
+
+
+@router.get("/{file_id}/metadata")
+async def get_floor_plan_metadata(file_id: int, db: AsyncSession = Depends(get_db)):
+    """Page count, page sizes and tile grids; status is pending until rendering finishes"""
+    project_service = ProjectService(db)
+    file_info = await project_service.get_floor_plan_file(file_id)
+    if not file_info:
+        raise HTTPException(status_code=404, detail="Floor plan file not found")
+    return {
+        "id": file_info.id,
+        "status": file_info.derivatives_status,
+        "page_count": file_info.page_count,
+        "pages": await project_service.get_floor_plan_pages(file_id),
+    }
+
+
+@router.get("/{file_id}/thumbnail")
+async def get_floor_plan_thumbnail(file_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """First-page thumbnail (PNG, a few KB)"""
+    file_info = await _ready_floor_plan(file_id, db)
+    return _derivative_response(request, thumbnail_path(file_info.sha256), f'"{file_info.sha256}-thumb"')
+
+
+@router.get("/{file_id}/pages/{page}/tiles/{x}/{y}")
+async def get_floor_plan_tile(
+    file_id: int, page: int, x: int, y: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """One tile of a page's low-res raster; the grid size is in /metadata"""
+    file_info = await _ready_floor_plan(file_id, db)
+    return _derivative_response(
+        request, tile_path(file_info.sha256, page, x, y), f'"{file_info.sha256}-{page}-{x}-{y}"'
+    )
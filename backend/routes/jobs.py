@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.models.job import Job
+from backend.services.job_queue import FINISHED, job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# How often the progress stream checks for changes
+STREAM_INTERVAL_S = 0.5
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: int):
+    """Job status and progress, for polling"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/stream")
+async def stream_job(job_id: int):
+    """Server-Sent Events: one event per change, ending once the job has finished
+
+    A job deleted or pruned mid-stream ends it with a "gone" event.
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        last = None
+        current = job
+        while True:
+            frame = json.dumps(current)
+            if frame != last:
+                yield f"data: {frame}\n\n"
+                last = frame
+            if current["status"] in FINISHED:
+                return
+            await asyncio.sleep(STREAM_INTERVAL_S)
+            current = await job_queue.get(job_id)
+            if current is None:
+                yield f"event: gone\ndata: {json.dumps({'id': job_id})}\n\n"
+                return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from backend.services.fleet_registry import fleet_registry
+from backend.services.floor_plan_derivatives import HAS_RENDERER
+from backend.services.history_writer import history_writer
+from backend.services.job_queue import job_queue
+from backend.services.password_hasher import password_hasher
+from backend.services.project_cache import project_cache
+from backend.services.user_service import user_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """Process-wide service counters (buffers, drops, flush timings)"""
+    return {
+        "history_writer": history_writer.stats(),
+        "password_hasher": password_hasher.stats(),
+        "user_cache": user_cache.stats(),
+        "project_cache": project_cache.stats(),
+        "jobs": job_queue.stats(),
+        "floor_plan_previews": {"renderer": HAS_RENDERER},
+        "safety": fleet_registry.safety_stats(),
+        "watchdog": fleet_registry.watchdog.stats(),
+    }
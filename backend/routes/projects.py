@@ -1,127 +1,306 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import get_db
-from backend.models.project import FloorPlanFile, Project, ProjectCreate, ProjectUpdate
-from backend.models.database_models import FloorPlanFile as DBFloorPlanFile
+from backend.database import AsyncSessionLocal, get_db
+from backend.models.project import (
+    FloorPlanFile, NearbyProject, Project, ProjectCreate, ProjectImport, ProjectUpdate
+)
+from backend.routes.floor_plans import REVALIDATE, etag_matches, floor_plan_response
+from backend.services.floor_plan_derivatives import (
+    PENDING, UNSUPPORTED, can_render, submit_derivatives
+)
+from backend.services.fast_json import FastJSONResponse, dumps
+from backend.services.floor_plan_storage import BadUpload, UploadTooLarge, store_upload
+from backend.services.project_cache import CachedResponse, project_cache
 from backend.services.project_service import ProjectService
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads/floor_plans")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Page size for GET /projects; the next page is requested with the X-Next-Cursor value
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Bulk import: rows per transaction, longest accepted NDJSON line, errors listed in the reply
+IMPORT_BATCH_SIZE = int(os.getenv("PROJECT_IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_LINE_BYTES = 1024 * 1024
+IMPORT_MAX_ERRORS = 1000
+
+
+def _cached_response(request: Request, cached: CachedResponse) -> Response:
+    """200 with the cached body, or 304 when the client already has this ETag"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if cached.next_cursor is not None:
+        headers["X-Next-Cursor"] = cached.next_cursor
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        project_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """(line number, line) for each non-blank line of a streamed body; None for an oversized line"""
+    buffer = b""
+    number = 0
+    skipping = False  # Inside a line that already exceeded the limit
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if skipping or len(line) > IMPORT_MAX_LINE_BYTES:
+                skipping = False
+                yield number, None
+            elif line.strip():
+                yield number, line
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            skipping, buffer = True, b""
+    if skipping or len(buffer) > IMPORT_MAX_LINE_BYTES:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, buffer
 
 
 @router.get("", response_model=List[Project])
-async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
+async def list_projects(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    completed: Optional[bool] = None,
+    owner: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """List projects a page at a time; X-Next-Cursor is set while more pages remain"""
+    try:
+        after_id = int(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    project_service = ProjectService(db)
+    cached = await project_service.list_projects_cached(
+        user_id=owner,
+        completed=completed,
+        updated_since=updated_since,
+        after_id=after_id,
+        limit=limit,
+    )
+    return _cached_response(request, cached)
+
+
+# Declared before /{project_id} so "search", "nearby" and "export" are not taken for project ids
+@router.get("/export")
+async def export_projects():
+    """Every project as NDJSON, one per line in id order; the body can be fed to POST /projects/bulk"""
+
+    async def lines() -> AsyncIterator[bytes]:
+        # The request's session is closed once the endpoint returns, so the stream opens its own
+        async with AsyncSessionLocal() as db:
+            async for batch in ProjectService(db).export_projects(IMPORT_BATCH_SIZE):
+                yield b"".join(dumps(project) + b"\n" for project in batch)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="projects.ndjson"'},
+    )
+
+
+@router.post("/bulk")
+async def import_projects(request: Request, db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+    """Import projects from a streamed NDJSON body, one ProjectImport per line
+
+    Rows are inserted IMPORT_BATCH_SIZE per transaction. Bad lines are skipped
+    and reported by line number; the rest of the file is still imported.
+    """
+    project_service = ProjectService(db)
+    imported = 0
+    failed = 0
+    errors: List[Dict[str, Any]] = []
+
+    def reject(line: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line, "error": error})
+
+    async def flush(batch: List[Tuple[int, ProjectImport]]):
+        nonlocal imported
+        try:
+            imported += len(await project_service.import_projects([p for _, p in batch]))
+            return
+        except Exception:
+            pass
+        # Something in the batch was refused by the database: retry row by row to find it
+        for line, project in batch:
+            try:
+                await project_service.import_projects([project])
+                imported += 1
+            except Exception as e:
+                reject(line, f"{type(e).__name__}: {e}")
+
+    batch: List[Tuple[int, ProjectImport]] = []
+    async for line, raw in _ndjson_lines(request):
+        if raw is None:
+            reject(line, f"Line exceeds {IMPORT_MAX_LINE_BYTES} bytes")
+            continue
+        try:
+            batch.append((line, ProjectImport.model_validate_json(raw)))
+        except ValidationError as e:
+            reject(line, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'line'}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
+
+
+@router.get("/search", response_model=List[Project], response_class=FastJSONResponse)
+async def search_projects(
+    q: str = Query(..., min_length=1, max_length=200),
+    completed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search over title, location, address and notes; the last word matches as a prefix"""
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    project_service = ProjectService(db)
+    # One extra row tells us whether another page exists
+    projects = await project_service.search_projects(q, completed, offset, limit + 1)
+    headers = {}
+    if len(projects) > limit:
+        projects = projects[:limit]
+        headers["X-Next-Cursor"] = str(offset + limit)
+    return FastJSONResponse(projects, headers=headers)
+
+
+@router.get("/nearby", response_model=List[NearbyProject], response_class=FastJSONResponse)
+async def nearby_projects(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    completed: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Projects nearest to a point (pass completed=false for open jobs); without radius_km, the k nearest"""
     project_service = ProjectService(db)
-    return project_service.list_projects()
+    projects = await project_service.nearby_projects(lat, lon, radius_km, limit, completed)
+    return FastJSONResponse(projects)
 
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: int, db: Session = Depends(get_db)) -> Project:
+async def get_project(project_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     project_service = ProjectService(db)
-    project = project_service.get_project(project_id)
-    if not project:
+    cached = await project_service.get_project_cached(project_id)
+    if not cached:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return _cached_response(request, cached)
 
 
 @router.post("", response_model=Project, status_code=201)
-async def create_project(project: ProjectCreate, db: Session = Depends(get_db)) -> Project:
+async def create_project(project: ProjectCreate, db: AsyncSession = Depends(get_db)) -> Project:
     project_service = ProjectService(db)
-    return project_service.create_project(project)
+    return await project_service.create_project(project)
 
 
 @router.patch("/{project_id}", response_model=Project)
 async def update_project(
     project_id: int, 
     updates: ProjectUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Project:
     project_service = ProjectService(db)
-    updated = project_service.update_project(project_id, updates)
+    updated = await project_service.update_project(project_id, updates)
     if not updated:
         raise HTTPException(status_code=404, detail="Project not found")
     return updated
 
 
-@router.post("/{project_id}/upload-floor-plan")
+# The body is parsed by store_upload rather than FastAPI, so describe it for the docs
+_UPLOAD_BODY = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object",
+    "properties": {"file": {"type": "string", "format": "binary"}},
+    "required": ["file"],
+}}}}}
+
+
+@router.post("/{project_id}/upload-floor-plan", openapi_extra=_UPLOAD_BODY)
 async def upload_floor_plan(
-    project_id: int, 
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ) -> Project:
-    """Upload a floor plan file (DWG or PDF) for a project."""
-    # Validate file type
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in [".dwg", ".pdf"]:
-        raise HTTPException(
-            status_code=400, detail="Only DWG and PDF files are supported"
-        )
-
+    """Upload a floor plan file (DWG or PDF) for a project, sent as multipart field "file"."""
     project_service = ProjectService(db)
     # Get project
-    project = project_service.get_project(project_id)
+    project = await project_service.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Save file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{project_id}_{timestamp}_{file.filename}"
-    file_path = UPLOAD_DIR / safe_filename
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Stream the body straight to the content-addressed store; identical plans are kept once
+    try:
+        filename, stored = await store_upload(request, suffixes=(".dwg", ".pdf"))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except BadUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Create floor plan file record in database
-    db_floor_plan = DBFloorPlanFile(
-        project_id=project_id,
-        filename=file.filename,
-        file_type=file_ext[1:],  # Remove the dot
-        file_path=str(file_path),
-        file_size=len(content),
+    file_type = Path(filename).suffix.lower()[1:]  # Remove the dot
+    floor_plan = await project_service.add_floor_plan_file(
+        project_id,
+        filename=filename,
+        file_type=file_type,
+        file_path=str(stored.path),
+        file_size=stored.size,
+        sha256=stored.sha256,
+        derivatives_status=PENDING if can_render(file_type) else UNSUPPORTED,
     )
-    db.add(db_floor_plan)
-    db.commit()
-    db.refresh(db_floor_plan)
+    # Previews render in the background; the upload returns without waiting
+    if can_render(file_type):
+        await submit_derivatives(floor_plan.id, str(stored.path), stored.sha256)
 
     # Return updated project
-    return project_service.get_project(project_id)
+    return await project_service.get_project(project_id)
 
 
 @router.get("/{project_id}/floor-plans/{file_id}/download")
 async def download_floor_plan(
     project_id: int, 
     file_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Download a floor plan file."""
+    """Download a floor plan file by its position in the project (prefer /floor-plans/{id}/download)."""
     project_service = ProjectService(db)
-    project = project_service.get_project(project_id)
+    project = await project_service.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     if not project.floor_plan_files or file_id >= len(project.floor_plan_files):
         raise HTTPException(status_code=404, detail="Floor plan file not found")
 
-    file_info = project.floor_plan_files[file_id]
-    file_path = Path(file_info.file_path)
-
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found on server")
-
-    return FileResponse(
-        path=str(file_path),
-        filename=file_info.filename,
-        media_type="application/octet-stream",
-    )
-
+    # The file at a position changes when the project's files do: no immutable caching here
+    return floor_plan_response(request, project.floor_plan_files[file_id], cache_control=REVALIDATE)
@@ -1,21 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
 from backend.models.models import MoveCommand, TurnCommand, LiftCommand, ArmCommand
 from backend.models.robot_state import RobotState
+from backend.models.user import User
+from backend.routes.auth import require_user
+from backend.services.fast_json import FastJSONResponse
 from backend.services.robot_service import RobotService
+from backend.services.fleet_registry import DEFAULT_ROBOT_ID, fleet_registry
+from backend.services.state_machine import TRANSITION_LOG_SIZE
 
+# Single-robot routes (/move, /status, ...) drive the default robot.
+# The same handlers are mounted under /robots/{robot_id} for the rest of the fleet.
+# Handlers are async so commands never wait for a threadpool slot; they only
+# hand the command to the robot's scheduler.
+# Motion commands require a session token (checked against the user cache, not
+# the database); stop and emergency_stop stay open so anyone can halt a robot.
 router = APIRouter()
+fleet_router = APIRouter(prefix="/robots", tags=["robots"])
+
+
+async def get_robot(robot_id: str = DEFAULT_ROBOT_ID) -> RobotService:
+    """Resolve a robot id (path param under /robots, default robot otherwise)"""
+    robot_service = fleet_registry.get(robot_id)
+    if robot_service is None:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    return robot_service
+
+def _submit_or_409(robot_service: RobotService, command: str, *args):
+    """Hand a motion command to the scheduler; 409 with the reason when the robot refuses it"""
+    if not robot_service.scheduler.submit(command, *args):
+        reason = robot_service.refusal_reason(command, *args) or "refused by the robot"
+        raise HTTPException(status_code=409, detail=f"{command.capitalize()} refused: {reason}")
 
-# Singleton instance for simplicity in this example
-# In a production app, use dependency injection properly
-robot_service = RobotService()
+@fleet_router.get("", response_model=List[str])
+def list_robots():
+    return fleet_registry.ids()
+
+@fleet_router.post("/{robot_id}", status_code=201)
+def register_robot(robot_id: str):
+    try:
+        fleet_registry.register(robot_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"robot_id": robot_id}
 
 @router.post("/move")
-def move(cmd: MoveCommand):
-    robot_service.move(cmd.speed)
+@fleet_router.post("/{robot_id}/move")
+async def move(cmd: MoveCommand, robot_service: RobotService = Depends(get_robot),
+               _user: User = Depends(require_user)):
+    _submit_or_409(robot_service, "move", cmd.speed)
     return {"status": "moving", "speed": cmd.speed}
 
 @router.post("/turn")
-def turn(cmd: TurnCommand):
+@fleet_router.post("/{robot_id}/turn")
+async def turn(cmd: TurnCommand, robot_service: RobotService = Depends(get_robot),
+               _user: User = Depends(require_user)):
     # Derive direction from speed if not provided
     # Positive speed = right turn, negative speed = left turn
     if cmd.direction is None:
@@ -27,29 +67,71 @@ def turn(cmd: TurnCommand):
             direction = "left"  # Default for speed 0
     else:
         direction = cmd.direction
-    robot_service.turn(cmd.speed, direction)
+    _submit_or_409(robot_service, "turn", cmd.speed, direction)
     return {"status": "turning", "speed": cmd.speed, "direction": direction}
 
 @router.post("/stop")
-def stop():
-    robot_service.stop()
+@fleet_router.post("/{robot_id}/stop")
+async def stop(robot_service: RobotService = Depends(get_robot)):
+    robot_service.scheduler.submit("stop")
     return {"status": "stopped"}
 
 @router.post("/emergency_stop")
-def emergency_stop():
-    robot_service.emergency_stop()
+@fleet_router.post("/{robot_id}/emergency_stop")
+async def emergency_stop(robot_service: RobotService = Depends(get_robot)):
+    robot_service.scheduler.submit("emergency_stop")
     return {"status": "emergency_stopped"}
 
 @router.post("/lift")
-def lift(cmd: LiftCommand):
-    robot_service.set_lift(cmd.height_cm, cmd.command)
+@fleet_router.post("/{robot_id}/lift")
+async def lift(cmd: LiftCommand, robot_service: RobotService = Depends(get_robot),
+               _user: User = Depends(require_user)):
+    _submit_or_409(robot_service, "lift", cmd.height_cm, cmd.command)
     return {"status": "lift_moved", "height": cmd.height_cm, "command": cmd.command}
 
 @router.post("/arm")
-def arm_control(cmd: ArmCommand):
-    robot_service.control_arm(cmd.direction)
+@fleet_router.post("/{robot_id}/arm")
+async def arm_control(cmd: ArmCommand, robot_service: RobotService = Depends(get_robot),
+                      _user: User = Depends(require_user)):
+    _submit_or_409(robot_service, "arm", cmd.direction)
     return {"status": "arm_moving", "direction": cmd.direction}
 
 @router.get("/status", response_model=RobotState)
-def get_status():
+@fleet_router.get("/{robot_id}/status", response_model=RobotState)
+async def get_status(robot_service: RobotService = Depends(get_robot)):
     return robot_service.get_state()
+
+@fleet_router.get("/{robot_id}/queue")
+async def get_queue_metrics(robot_service: RobotService = Depends(get_robot)):
+    """Command queue depth and command-to-actuation latency"""
+    return robot_service.scheduler.metrics()
+
+@fleet_router.get("/{robot_id}/transitions")
+async def get_transitions(
+    robot_id: str,
+    until: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=TRANSITION_LOG_SIZE),
+    robot_service: RobotService = Depends(get_robot),
+):
+    """State transitions tried up to until (epoch seconds), oldest first, refused ones included"""
+    return {
+        "robot_id": robot_id,
+        "state": robot_service.state_machine.get_state(),
+        "transitions": robot_service.state_machine.history(until, limit),
+    }
+
+@fleet_router.get("/{robot_id}/telemetry", response_class=FastJSONResponse)
+async def get_telemetry_history(
+    robot_id: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    resolution: Optional[float] = None,
+    robot_service: RobotService = Depends(get_robot),
+):
+    """Downsampled telemetry history; since/until are epoch seconds, resolution is seconds per point"""
+    until = until if until is not None else robot_service.clock.now()
+    since = since if since is not None else until - 3600
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    history = robot_service.history.downsample(since, until, resolution)
+    return {"robot_id": robot_id, "since": since, "until": until, **history}
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import math
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from backend.services.fleet_registry import DEFAULT_ROBOT_ID, fleet_registry
+from backend.services.telemetry_service import DEFAULT_RATE_HZ
+
+router = APIRouter(tags=["telemetry"])
+
+# Rates outside MIN_RATE_HZ..MAX_RATE_HZ are clamped; NaN and inf are refused (422)
+RATE_QUERY = Query(DEFAULT_RATE_HZ, allow_inf_nan=False)
+
+
+@router.websocket("/ws/telemetry")
+async def telemetry_ws(websocket: WebSocket, hz: float = RATE_QUERY,
+                       robot_id: str = DEFAULT_ROBOT_ID):
+    """Push robot state deltas; clients may send {"hz": <rate>} to change rate"""
+    robot_service = fleet_registry.get(robot_id)
+    if robot_service is None:
+        await websocket.close(code=4404, reason="Robot not found")
+        return
+    telemetry_hub = robot_service.telemetry
+    await websocket.accept()
+    subscription = telemetry_hub.subscribe(hz)
+
+    async def send_frames():
+        async for frame in subscription.frames():
+            await websocket.send_text(frame)
+
+    sender = asyncio.create_task(send_frames())
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                rate = float(json.loads(message)["hz"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if not math.isfinite(rate):
+                continue
+            telemetry_hub.set_rate(subscription, rate)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        telemetry_hub.unsubscribe(subscription)
+
+
+@router.get("/telemetry/stream")
+async def telemetry_sse(hz: float = RATE_QUERY, robot_id: str = DEFAULT_ROBOT_ID):
+    """Server-Sent Events fallback for clients that cannot open a WebSocket"""
+    robot_service = fleet_registry.get(robot_id)
+    if robot_service is None:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    telemetry_hub = robot_service.telemetry
+    subscription = telemetry_hub.subscribe(hz)
+
+    async def event_stream():
+        try:
+            async for frame in subscription.frames():
+                yield f"data: {frame}\n\n"
+        finally:
+            telemetry_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -2,18 +2,20 @@
 Seed the database with initial demo data.
 Run this script once after creating the database.
 """
-from backend.database import SessionLocal
+import asyncio
+
+from backend.database import AsyncSessionLocal
 from backend.services.user_service import UserService
 from backend.services.project_service import ProjectService
 from backend.models.user import UserCreate
 from backend.models.project import ProjectCreate
 
-def seed_users(db):
+async def seed_users(db):
     """Seed demo users"""
     user_service = UserService(db)
     
     # Check if users already exist
-    if user_service.get_user_by_username("alex"):
+    if await user_service.get_user_by_username("alex"):
         print("Users already seeded, skipping...")
         return
     
@@ -40,17 +42,18 @@ def seed_users(db):
         ),
     ]
     
+    # Bulk path: hashes every password in parallel across all cores
+    await user_service.create_users(users)
     for user_data in users:
-        user_service.create_user(user_data)
         print(f"Created user: {user_data.username}")
 
 
-def seed_projects(db):
+async def seed_projects(db):
     """Seed demo projects"""
     project_service = ProjectService(db)
     
     # Check if projects already exist
-    projects = project_service.list_projects()
+    projects = await project_service.list_projects(limit=1)
     if len(projects) > 0:
         print("Projects already seeded, skipping...")
         return
@@ -70,27 +73,26 @@ def seed_projects(db):
     ]
     
     for project_data in starter_projects:
-        project_service.create_project(project_data)
+        await project_service.create_project(project_data)
         print(f"Created project: {project_data.title}")
 
 
-def seed_all():
+async def seed_all():
     """Seed all initial data"""
-    db = SessionLocal()
-    try:
-        print("Seeding database...")
-        seed_users(db)
-        seed_projects(db)
-        print("Database seeded successfully!")
-    except Exception as e:
-        print(f"Error seeding database: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    # The services are async (shared with the API), so the script drives them with asyncio
+    async with AsyncSessionLocal() as db:
+        try:
+            print("Seeding database...")
+            await seed_users(db)
+            await seed_projects(db)
+            print("Database seeded successfully!")
+        except Exception as e:
+            print(f"Error seeding database: {e}")
+            await db.rollback()
 
 
 if __name__ == "__main__":
-    seed_all()
+    asyncio.run(seed_all())
 
 
 
@@ -0,0 +1,52 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Optional, Tuple
+
+# Set AUTH_SECRET_KEY in any real deployment; the random fallback means every
+# backend restart (including --reload) logs everybody out
+SECRET_KEY = (os.getenv("AUTH_SECRET_KEY") or secrets.token_urlsafe(32)).encode()
+TOKEN_TTL_S = int(os.getenv("AUTH_TOKEN_TTL_S", str(12 * 3600)))
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user_id: int, ttl: int = TOKEN_TTL_S) -> str:
+    """Issue a signed session token: <base64 payload>.<base64 HMAC-SHA256>"""
+    payload = _b64encode(json.dumps({"sub": user_id, "exp": int(time.time()) + ttl}).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def token_claims(token: str) -> Optional[Tuple[int, float]]:
+    """(user id, expiry time) of a valid, unexpired token (no database access)"""
+    payload, _, signature = token.partition(".")
+    if not payload or not signature or not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+        user_id, expires_at = int(claims["sub"]), float(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if expires_at < time.time():
+        return None
+    return user_id, expires_at
+
+
+def verify_token(token: str) -> Optional[int]:
+    """Return the user id of a valid, unexpired token (no database access)"""
+    claims = token_claims(token)
+    return claims[0] if claims else None
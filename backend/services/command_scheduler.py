@@ -0,0 +1,168 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from backend.simulator.lift import LIFT_MAX_CM, LIFT_MIN_CM, lift_target
+
+# Safety lane: run immediately on submit, ahead of anything queued
+SAFETY_COMMANDS = {"emergency_stop", "stop"}
+# Motion lane: one slot per command, a newer submit replaces the queued value
+# (relative lift jogs are added to it instead, see _MERGERS)
+MOTION_COMMANDS = {"move", "turn", "lift", "arm"}
+
+# journal(command, args, accepted, latency_ms), called after every executed command
+Journal = Callable[[str, Tuple[Any, ...], bool, float], None]
+
+# How many recent latency samples the percentiles are computed over
+LATENCY_WINDOW = 1024
+
+
+class LatencyStats:
+    """Rolling command-to-actuation latency, in milliseconds"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.samples.append(ms)
+        self.count += 1
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean": sum(ordered) / len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+            "max": self.max_ms,
+        }
+
+
+class CommandScheduler:
+    """Per-robot command queue with a safety lane and a coalescing motion lane
+
+    emergency_stop and stop never wait: they run inside submit() and throw
+    away any queued motion, so nothing queued earlier can run after them.
+    Motion commands are parked in one slot per command name and applied on
+    the next simulator tick; a slider sending fifty speed updates between
+    ticks costs one actuation with the latest value.
+
+    Queued motion is checked against the robot's safety limits on submit
+    (robot.precheck), so a command refused by those right now is refused at
+    once; one accepted into the queue can still be refused when the tick
+    applies it if the robot's state changed in between (journal records that).
+
+    With no ready set (a standalone RobotService) every command runs inline.
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, robot, ready: Optional[Set["CommandScheduler"]] = None,
+                 journal: Optional[Journal] = None):
+        self.robot = robot
+        self._ready = ready
+        self._journal = journal
+        # command -> (args, first submit time); dicts keep submit order
+        self._pending: Dict[str, Tuple[Tuple[Any, ...], float]] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.refused = 0  # Motion refused by the precheck, never queued
+        self.safety_latency = LatencyStats()
+        self.motion_latency = LatencyStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, command: str, *args: Any) -> bool:
+        """Queue or run a command; returns whether it was accepted (or queued after the precheck)"""
+        self.submitted += 1
+        now = time.perf_counter()
+        if command in SAFETY_COMMANDS:
+            self._pending.clear()
+            return self._run(command, args, now, self.safety_latency)
+        if command not in MOTION_COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+        if self._ready is None:
+            return self._run(command, args, now, self.motion_latency)
+        if not self.robot.precheck(command, *args):
+            self.refused += 1
+            return False
+
+        queued = self._pending.get(command)
+        if queued is not None:
+            # Keep the first submit time: that is how long the operator has waited
+            self.coalesced += 1
+            merge = _MERGERS.get(command)
+            if merge is not None:
+                args = merge(queued[0], args)
+            now = queued[1]
+        self._pending[command] = (args, now)
+        self._ready.add(self)
+        return True
+
+    def drain(self):
+        """Apply every queued motion command (called from the simulator tick)"""
+        while self._pending:
+            command = next(iter(self._pending))
+            args, submitted_at = self._pending.pop(command)
+            try:
+                self._run(command, args, submitted_at, self.motion_latency)
+            except Exception:
+                # A bad command must not take down the shared simulator loop
+                logging.exception(f"Queued command {command} failed")
+
+    def _run(self, command: str, args: Tuple[Any, ...], submitted_at: float,
+             stats: LatencyStats) -> bool:
+        accepted = getattr(self.robot, _HANDLERS[command])(*args)
+        latency_ms = (time.perf_counter() - submitted_at) * 1000.0
+        stats.record(latency_ms)
+        if self._journal is not None:
+            self._journal(command, args, accepted, latency_ms)
+        return accepted
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "refused": self.refused,
+            "latency_ms": {
+                "safety": self.safety_latency.summary(),
+                "motion": self.motion_latency.summary(),
+            },
+        }
+
+
+def _merge_lift(queued: Tuple[Any, ...], new: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """Fold a lift command into the queued one, so relative jogs add up instead of replacing each other"""
+    height_cm, command = new
+    if command == "set":
+        return new
+    queued_cm, queued_command = queued
+    if queued_command == "set":
+        return (lift_target(command, height_cm, queued_cm), "set")
+    delta = (queued_cm if queued_command == "up" else -queued_cm) + (height_cm if command == "up" else -height_cm)
+    # More than the full travel is the same as the full travel
+    delta = max(-(LIFT_MAX_CM - LIFT_MIN_CM), min(delta, LIFT_MAX_CM - LIFT_MIN_CM))
+    return (delta, "up") if delta >= 0 else (-delta, "down")
+
+
+# Queued args merged with a newer submit of the same command; others are replaced
+_MERGERS = {"lift": _merge_lift}
+
+# Scheduler command -> RobotService method
+_HANDLERS = {
+    "emergency_stop": "emergency_stop",
+    "stop": "stop_movement",
+    "move": "move",
+    "turn": "turn",
+    "lift": "set_lift",
+    "arm": "control_arm",
+}
@@ -0,0 +1,144 @@
+from functools import partial
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from backend.services.command_scheduler import CommandScheduler
+from backend.services.history_writer import HistoryWriter, history_writer
+from backend.services.robot_service import RobotService
+from backend.services.safety_service import build_safety_engine
+from backend.services.state_machine import LATCHED_STATES
+from backend.services.watchdog import CommandWatchdog
+from backend.services.telemetry_history import HISTORY_CAPACITY, HISTORY_RATE_HZ, TelemetryRing
+from backend.services.telemetry_service import TelemetryHub
+from backend.simulator.clock import Clock, RealClock
+from backend.simulator.fleet_simulator import STATUS_CODES, FleetSimulator
+
+# The robot served by the original single-robot routes (/move, /status, /commands/...)
+DEFAULT_ROBOT_ID = "robot-1"
+
+
+class FleetRegistry:
+    """All robots in the process, keyed by robot id
+
+    Every robot gets its own RobotService (state machine, safety service and
+    telemetry hub), but they are all simulated by one shared FleetSimulator,
+    so the whole fleet runs on a single asyncio task.
+    """
+
+    def __init__(self, fleet: Optional[FleetSimulator] = None,
+                 writer: Optional[HistoryWriter] = None,
+                 operator_clock: Optional[Clock] = None,
+                 history_capacity: int = HISTORY_CAPACITY):
+        self.fleet = fleet if fleet is not None else FleetSimulator()
+        # Time the operators live in: real for people at the UI or TCP gateway (also under
+        # SIM_CLOCK=scaled), the simulation clock for scripted operators such as shift.py
+        self.operator_clock = operator_clock if operator_clock is not None else RealClock()
+        # Optional write-behind persistence of telemetry samples and commands
+        self.writer = writer
+        # Samples kept in memory per robot (TelemetryRing); memory grows with the fleet
+        self.history_capacity = history_capacity
+        self._robots: Dict[str, RobotService] = {}
+        self._by_index: List[RobotService] = []  # Fleet array index -> service
+        # Rule table checked against the whole fleet after every tick's commands
+        self.safety = build_safety_engine()
+        # Deadlines of every robot's operator commands, measured on the operators' clock
+        # (checked every simulator tick)
+        self.watchdog = CommandWatchdog(start=self.operator_clock.monotonic())
+        # Schedulers with queued motion commands, drained on the next tick
+        self._ready: Set[CommandScheduler] = set()
+        self.fleet.add_tick_listener(self._drain_commands)
+        self.fleet.add_tick_listener(self._check_safety)
+        self.fleet.add_tick_listener(self._advance_watchdog)
+        self.fleet.add_tick_listener(self._publish_telemetry)
+        self.fleet.add_tick_listener(self._record_history)
+        # History is sampled every Nth simulator tick
+        self._history_every = max(1, round(self.fleet.tick_hz / HISTORY_RATE_HZ))
+        self._ticks_since_sample = 0
+
+    def __len__(self) -> int:
+        return len(self._robots)
+
+    def __contains__(self, robot_id: str) -> bool:
+        return robot_id in self._robots
+
+    def ids(self) -> List[str]:
+        return list(self._robots)
+
+    def get(self, robot_id: str) -> Optional[RobotService]:
+        return self._robots.get(robot_id)
+
+    def register(self, robot_id: str) -> RobotService:
+        """Add a robot to the fleet; raises ValueError if the id is taken"""
+        if robot_id in self._robots:
+            raise ValueError(f"Robot {robot_id} is already registered")
+        index = self.fleet.add_robot()
+        service = RobotService(telemetry=TelemetryHub(), simulator=self.fleet.view(index))
+        journal = partial(self.writer.add_command, robot_id) if self.writer else None
+        service.scheduler = CommandScheduler(service, ready=self._ready, journal=journal)
+        service.history = TelemetryRing(self.history_capacity)
+        service.watchdog = self.watchdog
+        service.watchdog_key = robot_id
+        self._robots[robot_id] = service
+        self._by_index.append(service)
+        return service
+
+    async def start(self):
+        await self.fleet.start()
+
+    async def stop(self):
+        await self.fleet.stop()
+
+    def _drain_commands(self, fleet: FleetSimulator, dt: float):
+        # Every scheduler holds a reference to this set, so empty it in place
+        ready = list(self._ready)
+        self._ready.clear()
+        for scheduler in ready:
+            scheduler.drain()
+
+    def _check_safety(self, fleet: FleetSimulator, dt: float):
+        # Robots already latched (ERROR, EMERGENCY_STOP) stay there until reset; only new violations act
+        for index, rule in self.safety.check(fleet):
+            service = self._by_index[index]
+            if service.state_machine.get_state() not in LATCHED_STATES:
+                service.fault(f"{rule.name}: {rule.message}")
+
+    def _advance_watchdog(self, fleet: FleetSimulator, dt: float):
+        self.watchdog.advance(self.operator_clock.monotonic())
+
+    def safety_stats(self) -> Dict[str, object]:
+        return self.safety.stats(tick_budget_ms=self.fleet.dt * 1000.0)
+
+    def _publish_telemetry(self, fleet: FleetSimulator, dt: float):
+        # Only robots somebody is watching pay for building a RobotState
+        for service in self._robots.values():
+            if service.telemetry.has_subscribers:
+                service.telemetry.publish(service.get_state())
+
+    def _record_history(self, fleet: FleetSimulator, dt: float):
+        self._ticks_since_sample += 1
+        if self._ticks_since_sample < self._history_every:
+            return
+        self._ticks_since_sample = 0
+
+        # Gather every robot's sample in one pass over the fleet arrays
+        n = fleet.count
+        columns = np.stack((fleet.x[:n], fleet.y[:n], fleet.angle[:n],
+                            fleet.battery[:n], fleet.lift[:n]))
+        now = fleet.clock.now()
+        for service in self._robots.values():
+            i = service.simulator.index
+            service.history.append(now, columns[:, i], fleet.status[i])
+
+        if self.writer is not None:
+            rows = columns.T.tolist()
+            statuses = [STATUS_CODES[code].value for code in fleet.status[:n]]
+            self.writer.add_telemetry([
+                (robot_id, now, *rows[service.simulator.index], statuses[service.simulator.index])
+                for robot_id, service in self._robots.items()
+            ])
+
+
+# Process-wide registry shared by every router
+fleet_registry = FleetRegistry(writer=history_writer)
+fleet_registry.register(DEFAULT_ROBOT_ID)
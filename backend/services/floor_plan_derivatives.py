@@ -0,0 +1,147 @@
+import importlib.util
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.database import AsyncSessionLocal
+from backend.models.database_models import FloorPlanFile as DBFloorPlanFile
+from backend.services.job_queue import job_queue
+from backend.services.project_cache import project_cache
+
+# Derivatives live per content hash, so a plan uploaded to many projects is rendered once:
+# uploads/derivatives/<sha256>/{meta.json, thumb.png, p<page>/<x>_<y>.png}
+DERIVATIVES_DIR = Path("uploads/derivatives")
+
+RENDER_JOB = "floor_plan_derivatives"
+DERIVATIVE_WORKERS = int(os.getenv("FLOOR_PLAN_WORKERS", "2"))  # Concurrent renders
+THUMBNAIL_WIDTH = 320
+TILE_SIZE = 256
+TILE_DPI = 50  # Low-res preview raster; a 36x24 in sheet is 1800x1200 px
+MAX_RASTER_PX = 4096
+
+# FloorPlanFile.derivatives_status values
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+UNSUPPORTED = "unsupported"  # DWG, or PyMuPDF is not installed
+
+# PyMuPDF is optional: without it uploads still work, they just get no previews
+# (reported under floor_plan_previews in /metrics)
+HAS_RENDERER = importlib.util.find_spec("pymupdf") is not None
+if not HAS_RENDERER:
+    logging.getLogger(__name__).warning("PyMuPDF not installed: floor plan previews are disabled")
+
+
+def can_render(file_type: str) -> bool:
+    return HAS_RENDERER and file_type == "pdf"
+
+
+def derivatives_dir(sha256: str) -> Path:
+    return DERIVATIVES_DIR / sha256
+
+
+def tile_path(sha256: str, page: int, x: int, y: int) -> Path:
+    return derivatives_dir(sha256) / f"p{page}" / f"{x}_{y}.png"
+
+
+def thumbnail_path(sha256: str) -> Path:
+    return derivatives_dir(sha256) / "thumb.png"
+
+
+def render_pdf(source: str, out_dir: str) -> Dict[str, Any]:
+    """Extract page metadata, a thumbnail and per-page tiles (runs in a worker process)
+
+    meta.json is written last, so its presence means the output is complete;
+    identical content that was already rendered is returned as-is.
+    """
+    out = Path(out_dir)
+    meta_file = out / "meta.json"
+    if meta_file.exists():
+        return json.loads(meta_file.read_text())
+
+    import pymupdf  # Optional dependency, only needed by the workers
+
+    out.mkdir(parents=True, exist_ok=True)
+    pages = []
+    with pymupdf.open(source) as doc:
+        for number, page in enumerate(doc):
+            rect = page.rect
+            if number == 0:
+                zoom = THUMBNAIL_WIDTH / rect.width
+                page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom)).save(str(out / "thumb.png"))
+
+            zoom = min(TILE_DPI / 72.0, MAX_RASTER_PX / max(rect.width, rect.height))
+            width, height = math.ceil(rect.width * zoom), math.ceil(rect.height * zoom)
+            tiles_x, tiles_y = math.ceil(width / TILE_SIZE), math.ceil(height / TILE_SIZE)
+            page_dir = out / f"p{number}"
+            page_dir.mkdir(exist_ok=True)
+            raster = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+            for y in range(tiles_y):
+                for x in range(tiles_x):
+                    # Copy the tile out of the page raster rather than re-rendering it
+                    clip = pymupdf.IRect(x * TILE_SIZE, y * TILE_SIZE,
+                                         min((x + 1) * TILE_SIZE, raster.width),
+                                         min((y + 1) * TILE_SIZE, raster.height))
+                    tile = pymupdf.Pixmap(raster.colorspace, clip, raster.alpha)
+                    tile.copy(raster, clip)
+                    tile.save(str(page_dir / f"{x}_{y}.png"))
+
+            pages.append({
+                "width_pt": rect.width,
+                "height_pt": rect.height,
+                "raster_width": width,
+                "raster_height": height,
+                "tiles_x": tiles_x,
+                "tiles_y": tiles_y,
+            })
+
+    meta = {"page_count": len(pages), "tile_size": TILE_SIZE, "pages": pages}
+    tmp = out / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta))
+    tmp.replace(meta_file)
+    return meta
+
+
+def render_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: render one stored file (runs on the job queue's process pool)"""
+    return render_pdf(payload["source"], str(derivatives_dir(payload["sha256"])))
+
+
+async def _record(file_id: int, status: str, meta: Optional[Dict[str, Any]] = None):
+    async with AsyncSessionLocal() as db:
+        fp = await db.get(DBFloorPlanFile, file_id)
+        if fp is None:
+            return
+        fp.derivatives_status = status
+        if meta is not None:
+            fp.page_count = meta["page_count"]
+            fp.page_meta = json.dumps(meta["pages"])
+        await db.commit()
+        project_cache.invalidate(fp.project_id)
+
+
+async def _on_rendered(job_id: int, payload: Dict[str, Any], meta: Dict[str, Any]):
+    await _record(payload["file_id"], READY, meta)
+
+
+async def _on_failed(job_id: int, payload: Dict[str, Any], error: str):
+    await _record(payload["file_id"], FAILED)
+
+
+job_queue.register(
+    RENDER_JOB, render_job,
+    processes=True,
+    concurrency=DERIVATIVE_WORKERS,
+    on_success=_on_rendered,
+    on_failure=_on_failed,
+)
+
+
+async def submit_derivatives(file_id: int, source: str, sha256: str) -> int:
+    """Queue preview rendering for an uploaded file; returns the job id without waiting"""
+    return await job_queue.enqueue(
+        RENDER_JOB, {"file_id": file_id, "source": source, "sha256": sha256}
+    )
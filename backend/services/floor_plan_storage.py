@@ -0,0 +1,156 @@
+import hashlib
+import os
+import secrets
+from pathlib import Path
+from typing import Collection, List, NamedTuple, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Content-addressed store: uploads/floor_plans/<sha[:2]>/<sha256>
+UPLOAD_DIR = Path("uploads/floor_plans")
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+# Room for boundaries, part headers and small form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class BadUpload(ValueError):
+    """Malformed multipart body, missing file part or unsupported file type"""
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    sha256: str
+    size: int
+
+
+def content_path(sha256: str) -> Path:
+    return UPLOAD_DIR / sha256[:2] / sha256
+
+
+class _FilePart:
+    """MultipartParser callbacks that collect the data of one named file field
+
+    The parser is fed one network chunk at a time; data of the wanted part
+    piles up in pending until store_upload writes it out.
+    """
+
+    def __init__(self, field: str, suffixes: Collection[str]):
+        self.field = field
+        self.suffixes = suffixes
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []
+        self._in_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict = {}
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field_data,
+            "on_header_value": self._header_value_data,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self):
+        self._headers = {}
+
+    def _header_field_data(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _header_value_data(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field or self.filename is not None or b"filename" not in options:
+            return
+        filename = Path(options[b"filename"].decode("utf-8", "replace")).name
+        if Path(filename).suffix.lower() not in self.suffixes:
+            raise BadUpload(f"Only {' and '.join(s[1:].upper() for s in self.suffixes)} files are supported")
+        self.filename = filename
+        self._in_file = True
+
+    def _part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def _part_end(self):
+        self._in_file = False
+
+
+async def store_upload(request: Request, suffixes: Collection[str], field: str = "file",
+                       max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, StoredFile]:
+    """Stream the file field of a multipart request body into the store; returns (filename, file)
+
+    The body is parsed as it arrives, so the limit holds while streaming: a
+    Content-Length over it is refused before reading, and otherwise the
+    upload stops at the first byte past it. The file is hashed on the way
+    to a single temporary copy. Identical content is kept once: if the hash
+    is already stored the temporary copy is discarded and the existing path
+    is returned.
+    """
+    limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+    too_large = UploadTooLarge(f"File exceeds the {max_bytes} byte upload limit")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise too_large
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+        raise BadUpload("Expected a multipart/form-data body")
+
+    part = _FilePart(field, suffixes)
+    parser = MultipartParser(options[b"boundary"], part.callbacks())
+    digest = hashlib.sha256()
+    received = size = 0
+    tmp_path = UPLOAD_DIR / f".upload-{secrets.token_hex(8)}"
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as out:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > limit:
+                    raise too_large
+                try:
+                    parser.write(chunk)
+                except BadUpload:
+                    raise
+                except Exception as e:  # python-multipart's parse errors
+                    raise BadUpload(f"Malformed multipart body: {e}")
+                for data in part.pending:
+                    size += len(data)
+                    if size > max_bytes:
+                        raise too_large
+                    digest.update(data)
+                    await out.write(data)
+                part.pending.clear()
+        parser.finalize()
+        if part.filename is None:
+            raise BadUpload(f"Missing file field: {field}")
+
+        sha256 = digest.hexdigest()
+        path = content_path(sha256)
+        if await anyio.Path(path).exists():
+            await anyio.Path(tmp_path).unlink()
+        else:
+            await anyio.Path(path.parent).mkdir(exist_ok=True)
+            await anyio.Path(tmp_path).replace(path)
+        return part.filename, StoredFile(path, sha256, size)
+    except BaseException:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+        raise
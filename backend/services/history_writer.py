@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+
+from backend.database import engine as default_engine
+from backend.models.database_models import CommandEvent, TelemetrySample
+from backend.simulator.clock import Clock, sim_clock
+
+# Flush when this many rows are pending, or after this long, whichever comes first
+FLUSH_ROWS = int(os.getenv("HISTORY_FLUSH_ROWS", "5000"))
+FLUSH_INTERVAL_S = float(os.getenv("HISTORY_FLUSH_INTERVAL_S", "1.0"))
+# Rows held in memory per table before new rows are dropped (and counted)
+MAX_PENDING_ROWS = int(os.getenv("HISTORY_MAX_PENDING_ROWS", "200000"))
+
+_TELEMETRY_COLUMNS = ("robot_id", "recorded_at", "x", "y", "theta",
+                      "battery_level", "lift_height", "status")
+_COMMAND_COLUMNS = ("robot_id", "recorded_at", "command", "args", "accepted", "latency_ms")
+
+
+def _insert_sql(table: str, columns: Sequence[str]) -> str:
+    return (f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})")
+
+
+_TELEMETRY_SQL = _insert_sql(TelemetrySample.__tablename__, _TELEMETRY_COLUMNS)
+_COMMAND_SQL = _insert_sql(CommandEvent.__tablename__, _COMMAND_COLUMNS)
+
+
+class HistoryWriter:
+    """Write-behind persistence of telemetry samples and command events
+
+    Producers (the simulator tick, command schedulers) only append tuples to
+    an in-memory buffer. A background thread swaps the buffers out and writes
+    them with one executemany per table inside a single transaction. The
+    buffers are bounded: when the database falls behind, new rows are dropped
+    and counted rather than stalling the simulator.
+    """
+
+    def __init__(self, engine: Engine, flush_rows: int = FLUSH_ROWS,
+                 flush_interval: float = FLUSH_INTERVAL_S, max_pending: int = MAX_PENDING_ROWS,
+                 clock: Clock = sim_clock):
+        self.engine = engine
+        self.clock = clock  # Stamps command events on the same timeline as telemetry
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._telemetry: List[Tuple] = []
+        self._commands: List[Tuple] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.written = {"telemetry": 0, "commands": 0}
+        self.dropped = {"telemetry": 0, "commands": 0}
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    def add_telemetry(self, rows: List[Tuple]):
+        """Queue telemetry rows ordered as robot_id, recorded_at, x, y, theta, battery, lift, status"""
+        with self._lock:
+            room = self.max_pending - len(self._telemetry)
+            if room < len(rows):
+                self.dropped["telemetry"] += len(rows) - max(room, 0)
+                rows = rows[:max(room, 0)]
+            self._telemetry.extend(rows)
+            if len(self._telemetry) >= self.flush_rows:
+                self._wakeup.notify()
+
+    def add_command(self, robot_id: str, command: str, args: Sequence[Any],
+                    accepted: bool, latency_ms: float):
+        with self._lock:
+            if len(self._commands) >= self.max_pending:
+                self.dropped["commands"] += 1
+                return
+            self._commands.append((robot_id, self.clock.now(), command, json.dumps(list(args)),
+                                   accepted, latency_ms))
+
+    @property
+    def pending(self) -> int:
+        return len(self._telemetry) + len(self._commands)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread after a final flush of everything buffered"""
+        if self._thread is None:
+            return
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stopping and self.pending < self.flush_rows:
+                    self._wakeup.wait(self.flush_interval)
+                telemetry, self._telemetry = self._telemetry, []
+                commands, self._commands = self._commands, []
+                stopping = self._stopping
+            if telemetry or commands:
+                self.flush(telemetry, commands)
+            if stopping:
+                return
+
+    def flush(self, telemetry: List[Tuple], commands: List[Tuple]):
+        started = time.perf_counter()
+        try:
+            with self.engine.begin() as conn:
+                if telemetry:
+                    conn.exec_driver_sql(_TELEMETRY_SQL, telemetry)
+                if commands:
+                    conn.exec_driver_sql(_COMMAND_SQL, commands)
+        except Exception:
+            # The batch is lost; count it as dropped and keep the writer alive.
+            # Counters are shared with add_* on the event loop thread, so update them under the lock
+            with self._lock:
+                self.failed_flushes += 1
+                self.dropped["telemetry"] += len(telemetry)
+                self.dropped["commands"] += len(commands)
+            logging.exception("History flush failed")
+            return
+        with self._lock:
+            self.flushes += 1
+            self.written["telemetry"] += len(telemetry)
+            self.written["commands"] += len(commands)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "written": dict(self.written),
+                "dropped": dict(self.dropped),
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+# Shared writer, started and stopped with the app
+history_writer = HistoryWriter(default_engine)
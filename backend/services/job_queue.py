@@ -0,0 +1,324 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy import func, select, update
+
+from backend.database import AsyncSessionLocal
+from backend.models.database_models import Job as DBJob
+
+# Job.status values
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = {SUCCEEDED, FAILED}
+# Error of a job that was running on its last attempt when the server stopped
+INTERRUPTED = "Interrupted on its last attempt"
+
+JOB_THREAD_WORKERS = int(os.getenv("JOB_THREAD_WORKERS", "4"))
+JOB_PROCESS_WORKERS = int(os.getenv("JOB_PROCESS_WORKERS", "2"))
+# Backstop poll for jobs enqueued by another process; local enqueues wake the dispatcher
+POLL_INTERVAL_S = 2.0
+# Retry n waits RETRY_BASE_S * 2**(n-1), capped, plus up to 10% jitter
+RETRY_BASE_S = float(os.getenv("JOB_RETRY_BASE_S", "2.0"))
+RETRY_MAX_S = 300.0
+
+ProgressFn = Callable[[float], None]
+# (job_id, payload, result or error message), awaited on the event loop
+JobHook = Callable[[int, Dict[str, Any], Any], Awaitable[None]]
+
+
+class JobType:
+    """How jobs of one type run
+
+    handler(payload, progress) runs on the thread pool (or on the loop when it
+    is a coroutine function). With processes=True it runs as handler(payload)
+    on the process pool instead and must be a picklable top-level function;
+    such jobs report no progress (0 until they finish, then 1).
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Any], concurrency: int = 1,
+                 processes: bool = False, max_attempts: int = 3,
+                 on_success: Optional[JobHook] = None, on_failure: Optional[JobHook] = None):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.processes = processes
+        self.max_attempts = max_attempts
+        self.on_success = on_success
+        self.on_failure = on_failure
+
+
+class JobQueue:
+    """Background jobs persisted in the jobs table
+
+    Every state change is written to the database, so a restart (including
+    uvicorn --reload) loses nothing: jobs that were running are put back in
+    the queue on start() and run again, unless that was their last attempt.
+    Higher priority runs first; each type has its own concurrency limit on top
+    of the shared pools. A process pool whose worker died is replaced.
+    """
+
+    def __init__(self, thread_workers: int = JOB_THREAD_WORKERS,
+                 process_workers: int = JOB_PROCESS_WORKERS):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._types: Dict[str, JobType] = {}
+        self._running: Dict[str, int] = defaultdict(int)
+        # Live progress of thread and coroutine jobs run by this process; it is not
+        # persisted, so other processes see the row's value (0 until finished)
+        self._progress: Dict[int, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+        self.pool_restarts = 0
+
+    def register(self, name: str, handler: Callable[..., Any], **options: Any) -> JobType:
+        job_type = JobType(name, handler, **options)
+        self._types[name] = job_type
+        return job_type
+
+    async def enqueue(self, job_type: str, payload: Optional[Dict[str, Any]] = None,
+                      priority: int = 0) -> int:
+        """Persist a job and wake the dispatcher; returns the job id"""
+        if job_type not in self._types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            job = DBJob(
+                type=job_type,
+                status=QUEUED,
+                priority=priority,
+                payload=json.dumps(payload or {}),
+                progress=0.0,
+                attempts=0,
+                max_attempts=self._types[job_type].max_attempts,
+                run_after=now,
+                created_at=now,
+            )
+            db.add(job)
+            await db.commit()
+            job_id = job.id
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(DBJob, job_id)
+            if job is None:
+                return None
+            return {
+                "id": job.id,
+                "type": job.type,
+                "status": job.status,
+                "priority": job.priority,
+                "progress": self._progress.get(job.id, job.progress),
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "result": json.loads(job.result) if job.result else None,
+                "error": job.error,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+                "run_after": job.run_after,
+            }
+
+    async def start(self):
+        if self._dispatcher is not None:
+            return
+        # Jobs left running by a previous process were interrupted; run them again,
+        # except those on their last attempt (they may be what took the process down)
+        async with AsyncSessionLocal() as db:
+            exhausted = (await db.execute(
+                select(DBJob.id, DBJob.type, DBJob.payload)
+                .where(DBJob.status == RUNNING, DBJob.attempts >= DBJob.max_attempts)
+            )).all()
+            if exhausted:
+                await db.execute(
+                    update(DBJob)
+                    .where(DBJob.id.in_([job_id for job_id, _, _ in exhausted]))
+                    .values(status=FAILED, error=INTERRUPTED, finished_at=time.time())
+                )
+            result = await db.execute(
+                update(DBJob).where(DBJob.status == RUNNING).values(status=QUEUED)
+            )
+            await db.commit()
+            self.recovered += result.rowcount
+        self.failed += len(exhausted)
+        for job_id, job_type, payload in exhausted:
+            spec = self._types.get(job_type)
+            if spec is not None:
+                await self._hook(spec.on_failure, job_id, json.loads(payload or "{}"), INTERRUPTED)
+        self._wakeup = asyncio.Event()
+        self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="job")
+        self._processes = self._new_process_pool()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs the simulator and writer threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def stop(self):
+        """Stop dispatching; unfinished jobs stay running in the table and resume on next start"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *self._tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        self._processes.shutdown(wait=False, cancel_futures=True)
+
+    async def _dispatch_loop(self):
+        while True:
+            try:
+                next_due = await self._dispatch()
+            except Exception:
+                logging.exception("Job dispatch failed")
+                next_due = None
+            timeout = POLL_INTERVAL_S
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _dispatch(self) -> Optional[float]:
+        """Claim and start due jobs for every type with a free slot; returns the next due time"""
+        free = [name for name, t in self._types.items() if self._running[name] < t.concurrency]
+        if not free:
+            return None
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            due = (await db.execute(
+                select(DBJob.id, DBJob.type, DBJob.payload)
+                .where(DBJob.status == QUEUED, DBJob.type.in_(free), DBJob.run_after <= now)
+                .order_by(DBJob.priority.desc(), DBJob.id)
+                .limit(64)
+            )).all()
+            for job_id, job_type, payload in due:
+                if self._running[job_type] >= self._types[job_type].concurrency:
+                    continue
+                claimed = await db.execute(
+                    update(DBJob)
+                    .where(DBJob.id == job_id, DBJob.status == QUEUED)
+                    .values(status=RUNNING, started_at=now, attempts=DBJob.attempts + 1)
+                )
+                if claimed.rowcount:
+                    self._running[job_type] += 1
+                    task = asyncio.create_task(self._run(job_id, job_type, json.loads(payload or "{}")))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            await db.commit()
+            return (await db.execute(
+                select(func.min(DBJob.run_after)).where(DBJob.status == QUEUED, DBJob.type.in_(free))
+            )).scalar()
+
+    async def _run(self, job_id: int, job_type: str, payload: Dict[str, Any]):
+        spec = self._types[job_type]
+        self._progress[job_id] = 0.0
+
+        def progress(fraction: float):
+            self._progress[job_id] = max(0.0, min(1.0, fraction))
+
+        try:
+            if asyncio.iscoroutinefunction(spec.handler):
+                result = await spec.handler(payload, progress)
+            elif spec.processes:
+                pool = self._processes
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        pool, spec.handler, payload)
+                except BrokenProcessPool:
+                    # A worker died (segfault, OOM) and took the pool with it; every job
+                    # on it fails the same way. Replace it once, then retry as usual
+                    if self._processes is pool:
+                        logging.error("Job process pool broke; starting a new one")
+                        self._processes = self._new_process_pool()
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        self.pool_restarts += 1
+                    raise
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._threads, spec.handler, payload, progress)
+        except asyncio.CancelledError:
+            # Shutdown: the row stays running and is requeued by the next start()
+            raise
+        except Exception as e:
+            logging.exception(f"Job {job_id} ({job_type}) failed")
+            await self._finish_failed(spec, job_id, payload, f"{type(e).__name__}: {e}")
+        else:
+            await self._finish(job_id, status=SUCCEEDED, progress=1.0, error=None,
+                               result=json.dumps(result), finished_at=time.time())
+            self.succeeded += 1
+            await self._hook(spec.on_success, job_id, payload, result)
+        finally:
+            self._running[job_type] -= 1
+            self._progress.pop(job_id, None)
+            self._wakeup.set()
+
+    async def _finish_failed(self, spec: JobType, job_id: int, payload: Dict[str, Any], error: str):
+        async with AsyncSessionLocal() as db:
+            attempts = (await db.execute(select(DBJob.attempts).where(DBJob.id == job_id))).scalar()
+        if attempts is None:
+            # The row was deleted while the job ran; nothing left to retry or mark failed
+            self.failed += 1
+            return
+        if attempts < spec.max_attempts:
+            delay = min(RETRY_BASE_S * 2 ** (attempts - 1), RETRY_MAX_S)
+            delay *= 1.0 + random.random() * 0.1
+            await self._finish(job_id, status=QUEUED, error=error, run_after=time.time() + delay)
+            self.retried += 1
+            return
+        await self._finish(job_id, status=FAILED, error=error, finished_at=time.time())
+        self.failed += 1
+        await self._hook(spec.on_failure, job_id, payload, error)
+
+    async def _finish(self, job_id: int, **values: Any):
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(DBJob).where(DBJob.id == job_id).values(**values))
+            await db.commit()
+
+    async def _hook(self, hook: Optional[JobHook], job_id: int, payload: Dict[str, Any], value: Any):
+        if hook is None:
+            return
+        try:
+            await hook(job_id, payload, value)
+        except Exception:
+            logging.exception(f"Completion hook of job {job_id} failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": {name: count for name, count in self._running.items() if count},
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered,
+            "pool_restarts": self.pool_restarts,
+        }
+
+
+# Shared queue, started and stopped with the app; job types register at import
+job_queue = JobQueue()
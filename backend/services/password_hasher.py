@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from passlib.context import CryptContext
+
+# Password hashing context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL, so threads hash in parallel; the pool size caps
+# how many hashes run at once, everything else waits in the pool queue
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+PASSWORD_TOO_LONG = "Password cannot exceed 72 characters. Please choose a shorter password."
+
+
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt (blocking, ~100-300 ms)"""
+    # Bcrypt has a 72-byte limit, validate before hashing
+    password_bytes = password.encode('utf-8')
+    password_byte_length = len(password_bytes)
+
+    if password_byte_length > 72:
+        raise ValueError(PASSWORD_TOO_LONG)
+
+    try:
+        return pwd_context.hash(password)
+    except Exception as e:
+        # Catch any password hashing errors (including passlib's 72-byte limit)
+        error_msg = str(e).lower()
+        # Only treat as 72-byte error if password is actually > 72 bytes OR error explicitly mentions it
+        # This prevents false positives from other errors
+        is_72_byte_error = (
+            password_byte_length > 72 or
+            ("72" in error_msg and ("byte" in error_msg or "character" in error_msg or "truncate" in error_msg))
+        )
+
+        if is_72_byte_error:
+            raise ValueError(PASSWORD_TOO_LONG)
+        # Re-raise other errors as-is
+        raise
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash (blocking)"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def hash_many(passwords: List[str], processes: Optional[int] = None) -> List[str]:
+    """Hash a batch of passwords on every core (bulk provisioning, seed scripts)"""
+    if not passwords:
+        return []
+    processes = processes or os.cpu_count() or 1
+    # spawn, as in job_queue: forking a process that runs the simulator and writer threads is unsafe
+    with ProcessPoolExecutor(max_workers=min(processes, len(passwords)),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(hash_password, passwords))
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded thread pool so logins never block the event loop"""
+
+    def __init__(self, workers: int = HASH_WORKERS):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0  # Running plus waiting for a worker
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Bulk hashing on a process pool, awaited without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, hash_many, passwords)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            return fn(*args), started, time.perf_counter()
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(
+                self._executor, timed
+            )
+        finally:
+            self.in_flight -= 1
+
+        wait_ms = (started - submitted) * 1000.0
+        self.completed += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_run_ms += (finished - started) * 1000.0
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "mean_wait_ms": self.total_wait_ms / completed,
+            "max_wait_ms": self.max_wait_ms,
+            "mean_hash_ms": self.total_run_ms / completed,
+        }
+
+
+# Shared hasher used by UserService
+password_hasher = PasswordHasher()
@@ -0,0 +1,78 @@
+import os
+import secrets
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from backend.services.fast_json import dumps
+from backend.services.lru_cache import LRUCache
+
+# Serialized responses kept in memory; writes invalidate, the TTL is only a backstop
+PROJECT_CACHE_SIZE = int(os.getenv("PROJECT_CACHE_SIZE", "2048"))
+PROJECT_CACHE_TTL_S = float(os.getenv("PROJECT_CACHE_TTL_S", "600"))
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    next_cursor: Optional[str] = None
+
+
+class ProjectCache:
+    """Serialized project responses with their ETags
+
+    Keys embed a version counter (per project, and one for all listings) that
+    every write bumps. Entries under an old version can never be read again, so
+    a read that raced a write cannot repopulate the cache with stale data.
+    ETags combine that version with the row's updated_at and a per-process
+    token, because the counters restart from zero with the process.
+    """
+
+    def __init__(self, maxsize: int = PROJECT_CACHE_SIZE, ttl: float = PROJECT_CACHE_TTL_S):
+        self._entries: LRUCache[CachedResponse] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[int, int] = {}
+        self._list_version = 0
+        self._epoch = secrets.token_hex(4)
+        self.not_modified = 0
+
+    def project_key(self, project_id: int) -> Tuple[Hashable, ...]:
+        return ("project", project_id, self._versions.get(project_id, 0))
+
+    def list_key(self, *params: Hashable) -> Tuple[Hashable, ...]:
+        return ("list", self._list_version) + params
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    def store_project(self, key: Tuple[Hashable, ...], project: Dict[str, Any],
+                      updated_at: Optional[datetime]) -> CachedResponse:
+        stamp = int(updated_at.timestamp() * 1e6) if updated_at else 0
+        entry = CachedResponse(
+            etag=f'"{self._epoch}-p{project["id"]}-{stamp}-{key[2]}"',
+            body=dumps(project),
+        )
+        self._entries.set(key, entry)
+        return entry
+
+    def store_list(self, key: Tuple[Hashable, ...], projects: List[Dict[str, Any]],
+                   next_cursor: Optional[str]) -> CachedResponse:
+        # Any write bumps the listing version, so it stands in for updated_at here
+        entry = CachedResponse(
+            etag=f'"{self._epoch}-l{key[1]}-{abs(hash(key[2:])):x}"',
+            body=dumps(projects),
+            next_cursor=next_cursor,
+        )
+        self._entries.set(key, entry)
+        return entry
+
+    def invalidate(self, project_id: int):
+        """Call after any write to a project or its floor plans"""
+        self._entries.invalidate(self.project_key(project_id))
+        self._versions[project_id] = self._versions.get(project_id, 0) + 1
+        self._list_version += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "not_modified": self.not_modified}
+
+
+# Shared by every ProjectService (one process, one cache)
+project_cache = ProjectCache()
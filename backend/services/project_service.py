@@ -1,61 +1,374 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from backend.models.project import Project, ProjectCreate, ProjectUpdate, LocationData, FloorPlanFile
+import json
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from backend.models.project import Project, ProjectCreate, ProjectImport, ProjectUpdate, FloorPlanFile
 from backend.models.database_models import Project as DBProject, FloorPlanFile as DBFloorPlanFile
+from backend.services.geo import MAX_DISTANCE_KM, bounding_box, haversine_km
+from backend.services.project_cache import CachedResponse, project_cache
+
+# Columns read by the dict fast path (see _project_dicts)
+_PROJECT_COLUMNS = (
+    DBProject.id, DBProject.title, DBProject.location, DBProject.location_address,
+    DBProject.location_latitude, DBProject.location_longitude, DBProject.notes,
+    DBProject.completed, DBProject.created_at, DBProject.updated_at,
+)
+_FLOOR_PLAN_COLUMNS = (
+    DBFloorPlanFile.id, DBFloorPlanFile.project_id, DBFloorPlanFile.filename,
+    DBFloorPlanFile.file_type, DBFloorPlanFile.file_path, DBFloorPlanFile.uploaded_at,
+    DBFloorPlanFile.file_size, DBFloorPlanFile.sha256, DBFloorPlanFile.derivatives_status,
+    DBFloorPlanFile.page_count,
+)
+
+# Full-text search: projects_fts (see database_models) with bm25 weights per column,
+# in PROJECT_FTS_COLUMNS order: title, location, location_address, notes
+_projects_fts = table("projects_fts", column("rowid"))
+_SEARCH_RANK = literal_column("bm25(projects_fts, 10.0, 5.0, 5.0, 1.0)")
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Spatial index (see database_models); k-nearest searches start at this radius and
+# widen 4x per round until k projects fall inside the circle
+_projects_rtree = table(
+    "projects_rtree", column("id"), column("min_lat"), column("max_lat"),
+    column("min_lon"), column("max_lon"),
+)
+KNN_START_RADIUS_KM = 10.0
+# The box is ordered by planar distance in SQL, which only approximates haversine
+# away from the centre, so this many times the limit go on to the exact check
+PLANAR_CANDIDATES = 4
+
+
+def _floor_plan_dict(fp: Any) -> Dict[str, Any]:
+    """FloorPlanFile fields from a Core row or an ORM object (the one DB -> API mapping)"""
+    return {
+        "id": fp.id,
+        "filename": fp.filename,
+        "file_type": fp.file_type,
+        "file_path": fp.file_path,
+        "uploaded_at": fp.uploaded_at.isoformat() if fp.uploaded_at else None,
+        "file_size": fp.file_size,
+        "sha256": fp.sha256,
+        "derivatives_status": fp.derivatives_status,
+        "page_count": fp.page_count,
+    }
+
+
+def _project_dict(row: Any, floor_plan_files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Project fields from a Core row or an ORM object, in Project.model_dump() order"""
+    return {
+        "title": row.title,
+        "location": row.location,
+        "location_data": {
+            "address": row.location_address,
+            "latitude": row.location_latitude,
+            "longitude": row.location_longitude,
+        } if row.location_address else None,
+        "floor_plans": [],  # Legacy field, keeping empty for now
+        "floor_plan_files": floor_plan_files,
+        "notes": row.notes,
+        "id": row.id,
+        "completed": row.completed,
+    }
+
+
+def fts_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix
+
+    Words are quoted, so user input can never inject FTS5 operators or syntax.
+    """
+    words = _SEARCH_TOKEN.findall(q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) >= 2:
+        # One-letter prefixes match most of the index and have no prefix index to use
+        terms[-1] += "*"
+    return " ".join(terms)
 
 
 class ProjectService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def list_projects(self, user_id: Optional[int] = None) -> List[Project]:
-        """List all projects, optionally filtered by user_id"""
-        query = self.db.query(DBProject)
-        if user_id:
-            query = query.filter(DBProject.user_id == user_id)
-        db_projects = query.all()
+    def _select_projects(self):
+        # Floor plans are loaded up front: async sessions cannot lazy-load relationships.
+        # populate_existing refreshes objects the session already holds after a write.
+        return (
+            select(DBProject)
+            .options(selectinload(DBProject.floor_plan_files))
+            .execution_options(populate_existing=True)
+        )
+    
+    async def _get_db_project(self, project_id: int) -> Optional[DBProject]:
+        result = await self.db.execute(
+            self._select_projects().where(DBProject.id == project_id)
+        )
+        return result.scalars().first()
+    
+    async def list_projects(
+        self,
+        user_id: Optional[int] = None,
+        completed: Optional[bool] = None,
+        updated_since: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Project]:
+        """List projects in id order, one keyset page at a time (after_id, limit)"""
+        query = self._filter_projects(
+            self._select_projects(), user_id, completed, updated_since, after_id, limit
+        )
+        db_projects = (await self.db.execute(query)).scalars().all()
         return [self._db_to_pydantic(p) for p in db_projects]
     
-    def get_project(self, project_id: int) -> Optional[Project]:
+    def _filter_projects(self, query, user_id, completed, updated_since, after_id, limit):
+        query = query.order_by(DBProject.id)
+        if user_id:
+            query = query.where(DBProject.user_id == user_id)
+        if completed is not None:
+            query = query.where(DBProject.completed == completed)
+        if updated_since is not None:
+            # updated_at is only set by the first update; fall back to creation time
+            query = query.where(func.coalesce(DBProject.updated_at, DBProject.created_at) >= updated_since)
+        if after_id is not None:
+            query = query.where(DBProject.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+    
+    async def _project_dicts(self, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Project-shaped dicts straight from Core rows: no ORM objects, no pydantic
+
+        Two queries per page (projects, then their floor plans with one IN).
+        The shape matches Project.model_dump(), field for field.
+        """
+        files: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        if rows:
+            fp_rows = await self.db.execute(
+                select(*_FLOOR_PLAN_COLUMNS)
+                .where(DBFloorPlanFile.project_id.in_([row.id for row in rows]))
+                .order_by(DBFloorPlanFile.id)
+            )
+            for fp in fp_rows:
+                files[fp.project_id].append(_floor_plan_dict(fp))
+        return [
+            _project_dict(row, files.get(row.id, []))
+            for row in rows
+        ]
+    
+    async def list_projects_cached(
+        self,
+        user_id: Optional[int] = None,
+        completed: Optional[bool] = None,
+        updated_since: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> CachedResponse:
+        """One serialized page of list_projects, with its ETag and next cursor"""
+        key = project_cache.list_key(user_id, completed, updated_since, after_id, limit)
+        cached = project_cache.get(key)
+        if cached is not None:
+            return cached
+        # One extra row tells us whether another page exists
+        query = self._filter_projects(
+            select(*_PROJECT_COLUMNS), user_id, completed, updated_since, after_id, limit + 1
+        )
+        rows = (await self.db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1].id)
+        return project_cache.store_list(key, await self._project_dicts(rows), next_cursor)
+    
+    async def search_projects(
+        self,
+        q: str,
+        completed: Optional[bool] = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Projects matching q, best match first (title hits outrank note hits)"""
+        match = fts_query(q)
+        if match is None:
+            return []
+        # Rank and filter inside the FTS query, then keep only the best offset + limit
+        # matches (a top-k sort) before joining back for the full rows
+        candidates = (
+            select(_projects_fts.c.rowid.label("id"), _SEARCH_RANK.label("score"))
+            .select_from(_projects_fts)
+            .join(DBProject, DBProject.id == _projects_fts.c.rowid)
+            .where(text("projects_fts MATCH :match").bindparams(match=match))
+        )
+        if completed is not None:
+            candidates = candidates.where(DBProject.completed == completed)
+        candidates = (
+            candidates
+            .order_by(literal_column("score"), _projects_fts.c.rowid.desc())
+            .limit(offset + limit)
+            .subquery()
+        )
+        query = (
+            select(*_PROJECT_COLUMNS)
+            .join(candidates, candidates.c.id == DBProject.id)
+            .order_by(candidates.c.score, DBProject.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = (await self.db.execute(query)).all()
+        return await self._project_dicts(rows)
+    
+    async def _projects_within(self, lat: float, lon: float, radius_km: float,
+                               completed: Optional[bool], limit: int) -> List[tuple]:
+        """(distance_km, id) of the nearest projects within radius_km, at most limit
+
+        The R*Tree narrows the search to the bounding box and SQL keeps the box's
+        nearest candidates by squared planar distance (degrees, longitude scaled
+        by cos(lat) and wrapped at the antimeridian); haversine on just those
+        rows then drops the box corners outside the circle and settles the order.
+        """
+        min_lat, max_lat, lon_ranges = bounding_box(lat, lon, radius_km)
+        dlat = DBProject.location_latitude - lat
+        dlon = func.abs(DBProject.location_longitude - lon)
+        dlon = func.min(dlon, 360.0 - dlon) * math.cos(math.radians(lat))
+        query = (
+            select(DBProject.id, DBProject.location_latitude, DBProject.location_longitude)
+            .join(_projects_rtree, _projects_rtree.c.id == DBProject.id)
+            .where(
+                _projects_rtree.c.max_lat >= min_lat,
+                _projects_rtree.c.min_lat <= max_lat,
+                or_(*(and_(_projects_rtree.c.max_lon >= lo, _projects_rtree.c.min_lon <= hi)
+                      for lo, hi in lon_ranges)),
+            )
+        )
+        if completed is not None:
+            query = query.where(DBProject.completed == completed)
+        query = query.order_by(dlat * dlat + dlon * dlon).limit(limit * PLANAR_CANDIDATES)
+        hits = []
+        for project_id, p_lat, p_lon in await self.db.execute(query):
+            distance = haversine_km(lat, lon, p_lat, p_lon)
+            if distance <= radius_km:
+                hits.append((distance, project_id))
+        hits.sort()
+        return hits[:limit]
+    
+    async def nearby_projects(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        completed: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """Nearest located projects, each with distance_km
+
+        With radius_km: everything inside the circle, nearest first.
+        Without: the k nearest, found by widening the radius until k fit.
+        """
+        if radius_km is not None:
+            hits = await self._projects_within(lat, lon, radius_km, completed, limit)
+        else:
+            radius_km = KNN_START_RADIUS_KM
+            while True:
+                hits = await self._projects_within(lat, lon, radius_km, completed, limit)
+                if len(hits) >= limit or radius_km >= MAX_DISTANCE_KM:
+                    break
+                radius_km = min(radius_km * 4, MAX_DISTANCE_KM)
+        if not hits:
+            return []
+
+        rows = (await self.db.execute(
+            select(*_PROJECT_COLUMNS).where(DBProject.id.in_([project_id for _, project_id in hits]))
+        )).all()
+        projects = {project["id"]: project for project in await self._project_dicts(rows)}
+        return [
+            {**projects[project_id], "distance_km": round(distance, 3)}
+            for distance, project_id in hits
+            if project_id in projects
+        ]
+    
+    async def get_project(self, project_id: int) -> Optional[Project]:
         """Get a single project by ID"""
-        db_project = self.db.query(DBProject).filter(DBProject.id == project_id).first()
+        db_project = await self._get_db_project(project_id)
         return self._db_to_pydantic(db_project) if db_project else None
     
-    def create_project(self, data: ProjectCreate, user_id: Optional[int] = None) -> Project:
-        """Create a new project"""
-        db_project = DBProject(
+    async def get_project_cached(self, project_id: int) -> Optional[CachedResponse]:
+        """Serialized get_project with its ETag, served from the read cache when possible"""
+        key = project_cache.project_key(project_id)
+        cached = project_cache.get(key)
+        if cached is not None:
+            return cached
+        row = (await self.db.execute(
+            select(*_PROJECT_COLUMNS).where(DBProject.id == project_id)
+        )).first()
+        if not row:
+            return None
+        (project,) = await self._project_dicts([row])
+        return project_cache.store_project(key, project, row.updated_at or row.created_at)
+    
+    def _new_db_project(self, data: ProjectCreate, user_id: Optional[int] = None,
+                        completed: bool = False) -> DBProject:
+        """Unsaved project with its floor plan files attached (inserted in one flush)"""
+        return DBProject(
             title=data.title,
             location=data.location,
             location_address=data.location_data.address if data.location_data else None,
             location_latitude=data.location_data.latitude if data.location_data else None,
             location_longitude=data.location_data.longitude if data.location_data else None,
             notes=data.notes,
-            completed=False,
+            completed=completed,
             user_id=user_id,
-        )
-        self.db.add(db_project)
-        self.db.commit()
-        self.db.refresh(db_project)
-        
-        # Handle floor plan files if provided
-        if data.floor_plan_files:
-            for fp in data.floor_plan_files:
-                from datetime import datetime
-                db_fp = DBFloorPlanFile(
-                    project_id=db_project.id,
+            floor_plan_files=[
+                DBFloorPlanFile(
                     filename=fp.filename,
                     file_type=fp.file_type,
                     file_path=fp.file_path,
                     uploaded_at=datetime.fromisoformat(fp.uploaded_at) if fp.uploaded_at else None,
+                    file_size=fp.file_size,
+                    sha256=fp.sha256,
                 )
-                self.db.add(db_fp)
-            self.db.commit()
-        
-        return self._db_to_pydantic(db_project)
+                for fp in data.floor_plan_files
+            ],
+        )
+    
+    async def create_project(self, data: ProjectCreate, user_id: Optional[int] = None) -> Project:
+        """Create a new project (and its floor plan files) in one transaction"""
+        db_project = self._new_db_project(data, user_id)
+        self.db.add(db_project)
+        await self.db.commit()
+        project_cache.invalidate(db_project.id)
+        return await self.get_project(db_project.id)
+    
+    async def import_projects(self, batch: Sequence[ProjectImport]) -> List[int]:
+        """Insert a batch of projects in a single transaction; returns their ids
+
+        All or nothing: on error the transaction is rolled back and re-raised.
+        """
+        db_projects = [self._new_db_project(data, completed=data.completed) for data in batch]
+        self.db.add_all(db_projects)
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        for db_project in db_projects:
+            project_cache.invalidate(db_project.id)
+        return [db_project.id for db_project in db_projects]
     
-    def update_project(self, project_id: int, updates: ProjectUpdate) -> Optional[Project]:
+    async def export_projects(self, batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Every project as dicts, batch by batch from a server-side cursor (constant memory)"""
+        result = await self.db.stream(
+            select(*_PROJECT_COLUMNS).order_by(DBProject.id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield await self._project_dicts(rows)
+    
+    async def update_project(self, project_id: int, updates: ProjectUpdate) -> Optional[Project]:
         """Update an existing project"""
-        db_project = self.db.query(DBProject).filter(DBProject.id == project_id).first()
+        db_project = await self._get_db_project(project_id)
         if not db_project:
             return None
         
@@ -82,39 +395,40 @@ class ProjectService:
             if hasattr(db_project, key):
                 setattr(db_project, key, value)
         
-        self.db.commit()
-        self.db.refresh(db_project)
-        return self._db_to_pydantic(db_project)
+        await self.db.commit()
+        project_cache.invalidate(project_id)
+        return await self.get_project(project_id)
+    
+    async def add_floor_plan_file(self, project_id: int, **fields) -> Optional[FloorPlanFile]:
+        """Record an uploaded floor plan file and bump the project's updated_at"""
+        db_project = await self._get_db_project(project_id)
+        if not db_project:
+            return None
+        db_fp = DBFloorPlanFile(project_id=project_id, **fields)
+        self.db.add(db_fp)
+        db_project.updated_at = func.now()
+        await self.db.commit()
+        project_cache.invalidate(project_id)
+        return self._floor_plan_to_pydantic(db_fp)
+    
+    async def get_floor_plan_file(self, file_id: int) -> Optional[FloorPlanFile]:
+        """Get a single floor plan file by its ID (primary key lookup, no project load)"""
+        db_fp = await self.db.get(DBFloorPlanFile, file_id)
+        return self._floor_plan_to_pydantic(db_fp) if db_fp else None
+    
+    async def get_floor_plan_pages(self, file_id: int) -> Optional[List[dict]]:
+        """Per-page sizes and tile grids produced by the derivative pipeline"""
+        result = await self.db.execute(
+            select(DBFloorPlanFile.page_meta).where(DBFloorPlanFile.id == file_id)
+        )
+        page_meta = result.scalar()
+        return json.loads(page_meta) if page_meta else None
+    
+    def _floor_plan_to_pydantic(self, fp: DBFloorPlanFile) -> FloorPlanFile:
+        return FloorPlanFile(**_floor_plan_dict(fp))
     
     def _db_to_pydantic(self, db_project: DBProject) -> Project:
         """Convert SQLAlchemy model to Pydantic model"""
-        location_data = None
-        if db_project.location_address:
-            location_data = LocationData(
-                address=db_project.location_address,
-                latitude=db_project.location_latitude,
-                longitude=db_project.location_longitude,
-            )
-        
-        # Get floor plan files
-        floor_plan_files = [
-            FloorPlanFile(
-                filename=fp.filename,
-                file_type=fp.file_type,
-                file_path=fp.file_path,
-                uploaded_at=fp.uploaded_at.isoformat() if fp.uploaded_at else None,
-            )
-            for fp in db_project.floor_plan_files
-        ]
-        
-        return Project(
-            id=db_project.id,
-            title=db_project.title,
-            location=db_project.location,
-            location_data=location_data,
-            floor_plans=[],  # Legacy field, keeping empty for now
-            floor_plan_files=floor_plan_files,
-            notes=db_project.notes,
-            completed=db_project.completed,
-        )
+        floor_plan_files = [_floor_plan_dict(fp) for fp in db_project.floor_plan_files]
+        return Project(**_project_dict(db_project, floor_plan_files))
 
@@ -1,13 +1,49 @@
+import asyncio
+from typing import Optional
 from backend.models.robot_state import RobotState, RobotStatus
+from backend.simulator.lift import LIFT_COMMANDS
 from backend.simulator.robot_simulator import RobotSimulator
+from backend.services.command_scheduler import CommandScheduler
 from backend.services.safety_service import SafetyService
-from backend.services.state_machine import StateMachine
+from backend.services.state_machine import LATCHED_STATES, StateMachine
+from backend.services.telemetry_service import TelemetryHub
+
+ARM_DIRECTIONS = ("forward", "backward", "up", "down")
 
 class RobotService:
-    def __init__(self):
-        self.simulator = RobotSimulator()
+    def __init__(self, telemetry: Optional[TelemetryHub] = None, simulator=None):
+        # simulator is any handle with the RobotSimulator surface (e.g. a FleetRobotView)
+        self.simulator = simulator if simulator is not None else RobotSimulator(telemetry=telemetry)
+        # Simulated time, shared with the simulator; real time unless SIM_CLOCK says otherwise
+        self.clock = self.simulator.clock
+        # clock.monotonic() of the last accepted operator command
+        self.last_command_at: Optional[float] = None
+        # Command watchdog and this robot's key in it, attached by the fleet registry
+        self.watchdog = None
+        self.watchdog_key = None
+        self.telemetry = telemetry
+        if telemetry is not None:
+            telemetry.state_source = self.get_state
         self.safety_service = SafetyService()
-        self.state_machine = StateMachine()
+        # Entering a latched state cuts motion whatever the path in; leaving it is the reset
+        self.state_machine = StateMachine(
+            guards={"battery_ok": self._battery_ok},
+            on_enter={status: self._latched for status in LATCHED_STATES},
+            on_exit={status: self._unlatched for status in LATCHED_STATES},
+            clock=self.clock.now,
+        )
+        # Routes and the TCP gateway submit through here; the fleet registry
+        # swaps in a queued scheduler drained by the simulator tick
+        self.scheduler = CommandScheduler(self)
+        # Telemetry history ring, attached by the fleet registry
+        self.history = None
+        # Set while the lift rests on its target; cleared by every lift command
+        self.lift_settled = asyncio.Event()
+        self.lift_settled.set()
+        self.simulator.on_lift_arrived = self._lift_arrived
+        self.simulator.on_status_changed = self._publish_now
+        # Why the robot was last put in ERROR; cleared by the manual reset (STOP)
+        self.error_message: Optional[str] = None
 
     async def start(self):
         await self.simulator.start()
@@ -16,7 +52,55 @@ class RobotService:
         await self.simulator.stop()
 
     def get_state(self) -> RobotState:
-        return self.simulator.get_state()
+        state = self.simulator.get_state()
+        state.error_message = self.error_message
+        return state
+
+    def _enter(self, status: RobotStatus) -> bool:
+        """Transition the state machine, treating the current state as a no-op"""
+        if self.state_machine.get_state() == status:
+            return True
+        return self.state_machine.transition_to(status)
+
+    def precheck(self, command: str, *args) -> bool:
+        """Whether a motion command would pass the safety checks right now (before it is queued)"""
+        return self.refusal_reason(command, *args) is None
+
+    def refusal_reason(self, command: str, *args) -> Optional[str]:
+        """Why precheck would refuse a motion command right now, or None if it would pass"""
+        current_state = self.get_state()
+        if current_state.status in LATCHED_STATES:
+            return f"robot is in {current_state.status.value}"
+        if not self.safety_service.check_safety(current_state):
+            return f"battery below {self.safety_service.min_battery:g}%"
+        if command == "lift":
+            height_cm, lift_command = args
+            if lift_command not in LIFT_COMMANDS:
+                return f"unknown lift command {lift_command!r}"
+            if not self.safety_service.validate_command("lift", height_cm, current_state, lift_command):
+                return "lift target outside the safety limits"
+            return None
+        if command == "arm":
+            return None if args[0] in ARM_DIRECTIONS else f"unknown arm direction {args[0]!r}"
+        if not self.safety_service.validate_command(command, args[0], current_state):
+            return f"{command} outside the safety limits"
+        return None
+
+    def _battery_ok(self) -> bool:
+        return self.simulator.get_state().battery_level >= self.safety_service.min_battery
+
+    def _halt(self):
+        self.simulator.set_speed(0.0)
+        self.simulator.set_turn_rate(0.0)
+        self.simulator.halt_lift()
+        self.lift_settled.set()
+
+    def _latched(self, old_state: RobotStatus, new_state: RobotStatus):
+        self._disarm_watchdog()
+        self._halt()
+
+    def _unlatched(self, old_state: RobotStatus, new_state: RobotStatus):
+        self.error_message = None
 
     def move(self, speed: float) -> bool:
         """Move the robot with given speed"""
@@ -25,22 +109,43 @@ class RobotService:
         # Check safety
         if not self.safety_service.check_safety(current_state):
             return False
+        if not self.safety_service.validate_command("move", speed, current_state):
+            return False
 
-        # Check state transition
-        if not self.state_machine.transition_to(RobotStatus.MOVING):
+        # Check state transition (speed updates while already moving are fine)
+        if not self._enter(RobotStatus.MOVING):
             return False
 
         # Update simulator
+        self.simulator.set_speed(speed)
         self.simulator.update_status(RobotStatus.MOVING)
+        self._command_accepted()
         
         # In a real scenario, we would send commands to hardware here
         # For now, the simulator loop handles position updates
         
         return True
 
+    def _command_accepted(self):
+        """Note operator activity and push the watchdog deadline back"""
+        self.last_command_at = self.clock.monotonic()
+        if self.watchdog is not None:
+            self.watchdog.kick(self.watchdog_key, self)
+
+    def _disarm_watchdog(self):
+        if self.watchdog is not None:
+            self.watchdog.disarm(self.watchdog_key)
+
+    def watchdog_expired(self):
+        """The operator went quiet: stop, unless a fault or emergency stop already did"""
+        if self.state_machine.get_state() not in LATCHED_STATES:
+            self.stop_movement()
+
     def stop_movement(self) -> bool:
         """Stop the robot"""
-        if self.state_machine.transition_to(RobotStatus.IDLE):
+        self._disarm_watchdog()
+        if self._enter(RobotStatus.IDLE):
+            self._halt()
             self.simulator.update_status(RobotStatus.IDLE)
             return True
         return False
@@ -52,33 +157,72 @@ class RobotService:
         # Check safety
         if not self.safety_service.check_safety(current_state):
             return False
+        if not self.safety_service.validate_command("turn", speed, current_state):
+            return False
 
-        # Check state transition
-        if not self.state_machine.transition_to(RobotStatus.MOVING):
+        # Check state transition (steering while driving stays MOVING)
+        status = RobotStatus.MOVING if current_state.status == RobotStatus.MOVING else RobotStatus.TURNING
+        if not self._enter(status):
             return False
 
         # Update simulator
-        self.simulator.update_status(RobotStatus.MOVING)
+        self.simulator.set_turn_rate(speed if direction == "right" else -speed)
+        self.simulator.update_status(status)
+        self._command_accepted()
         
         return True
 
     def emergency_stop(self) -> bool:
         """Emergency stop the robot"""
-        self.simulator.update_status(RobotStatus.MOVING)
+        # Cut motion first, even if already latched, then latch EMERGENCY_STOP until a manual reset (STOP)
+        self._disarm_watchdog()
+        self._halt()
+        self._enter(RobotStatus.EMERGENCY_STOP)
+        self.simulator.update_status(RobotStatus.EMERGENCY_STOP)
         return True
 
+    def fault(self, reason: str):
+        """Stop in ERROR on a safety rule violation, keeping the reason for status"""
+        print(f"[SAFETY] {reason}")
+        self._enter(RobotStatus.ERROR)
+        # Set after entering ERROR (leaving a latched state clears it) and before the status push
+        self.error_message = reason
+        self.simulator.update_status(RobotStatus.ERROR)
+
     def set_lift(self, height_cm: float, command: str) -> bool:
-        """Set lift height (up, down, set)"""
+        """Start a lift move (up, down, set) without waiting for it; await lift_settled for arrival"""
+        current_state = self.get_state()
+
         # Validate inputs
-        if not 0 <= height_cm <= 200:
+        if command not in LIFT_COMMANDS:
             return False
-        
-        if command not in ["up", "down", "set"]:
+        if not self.safety_service.validate_command("lift", height_cm, current_state, command):
+            return False
+
+        if not self.safety_service.check_safety(current_state):
             return False
         
-        # In a real scenario, we would control the lift hardware here
+        self.simulator.command_lift(command, height_cm)
+        if self.simulator.lift_moving:
+            self.lift_settled.clear()
+            # A standing robot shows LIFT_MOVING until the lift arrives; moving robots keep their state
+            if current_state.status == RobotStatus.IDLE and self._enter(RobotStatus.LIFT_MOVING):
+                self.simulator.update_status(RobotStatus.LIFT_MOVING)
         return True
 
+    def _lift_arrived(self, height_cm: float):
+        self.lift_settled.set()
+        if self.state_machine.get_state() == RobotStatus.LIFT_MOVING and self._enter(RobotStatus.IDLE):
+            self.simulator.update_status(RobotStatus.IDLE)
+        else:
+            # Push the final height right away instead of waiting for the next telemetry frame
+            self._publish_now()
+
+    def _publish_now(self):
+        """Push the current state to telemetry subscribers without waiting for the next tick"""
+        if self.telemetry is not None and self.telemetry.has_subscribers:
+            self.telemetry.publish(self.get_state(), urgent=True)
+
     def control_arm(self, direction: str) -> bool:
         """Control robot arm movement"""
         current_state = self.get_state()
@@ -88,15 +232,16 @@ class RobotService:
             return False
         
         # Validate direction
-        if direction not in ["forward", "backward", "up", "down"]:
+        if direction not in ARM_DIRECTIONS:
             return False
         
-        # Check state transition
-        if not self.state_machine.transition_to(RobotStatus.LIFT_MOVING):
+        # Check state transition (repeated arm commands while it moves are fine)
+        if not self._enter(RobotStatus.LIFT_MOVING):
             return False
         
         # Update simulator
         self.simulator.update_status(RobotStatus.LIFT_MOVING)
+        self._command_accepted()
         
         # In a real scenario, we would send commands to arm hardware here
         # For now, just log the command
@@ -0,0 +1,147 @@
+import operator
+import time
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.command_scheduler import LatencyStats
+
+# Per-rule timings are sampled every Nth evaluation; the combined pass is timed every tick
+RULE_TIMING_EVERY = 50
+
+OPERATORS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# fn(fleet, n) -> one value per robot for the first n robots; unknown fields fail at compile time
+FieldFn = Callable[..., np.ndarray]
+
+
+class SafetyRule(NamedTuple):
+    """A named conjunction of (field, operator, limit) conditions that must never all hold"""
+    name: str
+    conditions: Tuple[Tuple[str, str, float], ...]
+    message: str
+
+
+# Built in: every comparison against NaN is False, so no table rule can catch a
+# robot whose values went non-finite; this one is checked on every field
+NON_FINITE_RULE = SafetyRule("non_finite", (), "Non-finite value in the robot state")
+
+
+class SafetyEngine:
+    """Evaluates a fixed rule table against every robot at once
+
+    compile() turns the rules into flat condition arrays (field row, operator
+    and limit per condition, grouped by rule), so a tick costs one gather of
+    the fields, one comparison per operator in use and one
+    logical_and.reduceat, however many robots there are. A last row flags
+    robots with a NaN or infinite value in any field (NON_FINITE_RULE).
+    """
+
+    def __init__(self, rules: Sequence[SafetyRule], fields: Dict[str, FieldFn]):
+        self.rules = list(rules)
+        self.fields = fields
+        self.evaluations = 0
+        self.violations = {rule.name: 0 for rule in self.rules + [NON_FINITE_RULE]}
+        self.latency = LatencyStats()
+        self.rule_latency = {rule.name: LatencyStats() for rule in self.rules}
+        self._compile()
+
+    def _compile(self):
+        if not self.rules:
+            raise ValueError("A safety engine needs at least one rule")
+        # Every field is gathered, referenced or not, for the non-finite check
+        used: List[str] = list(self.fields)
+        rows, ops, limits, starts = [], [], [], []
+        for rule in self.rules:
+            if not rule.conditions:
+                raise ValueError(f"Safety rule {rule.name} has no conditions")
+            starts.append(len(rows))
+            for field, op, limit in rule.conditions:
+                if field not in self.fields:
+                    raise ValueError(f"Safety rule {rule.name}: unknown field {field}")
+                if op not in OPERATORS:
+                    raise ValueError(f"Safety rule {rule.name}: unknown operator {op}")
+                rows.append(used.index(field))
+                ops.append(op)
+                limits.append(limit)
+
+        self._used_fields = used
+        self._rows = np.array(rows, dtype=np.intp)
+        self._limits = np.array(limits, dtype=np.float64)[:, None]
+        self._starts = np.array(starts, dtype=np.intp)
+        # Conditions sharing an operator are compared in one call:
+        # (compare, condition indices, their field rows, their limits)
+        self._op_groups = []
+        for op in dict.fromkeys(ops):
+            group = np.array([i for i, o in enumerate(ops) if o == op], dtype=np.intp)
+            self._op_groups.append((OPERATORS[op], group, self._rows[group], self._limits[group]))
+        # Condition index ranges per rule, for the sampled per-rule timing
+        ends = starts[1:] + [len(rows)]
+        self._rule_slices = [slice(start, end) for start, end in zip(starts, ends)]
+
+    def _gather(self, fleet, n: int) -> np.ndarray:
+        return np.stack([self.fields[name](fleet, n) for name in self._used_fields])
+
+    def evaluate(self, fleet) -> np.ndarray:
+        """(rules + 1 x robots) boolean matrix of violated rules; the last row is NON_FINITE_RULE"""
+        n = fleet.count
+        started = time.perf_counter()
+        values = self._gather(fleet, n)
+        held = np.empty((len(self._rows), n), dtype=bool)
+        for compare, group, rows, limits in self._op_groups:
+            held[group] = compare(values[rows], limits)
+        violated = np.empty((len(self.rules) + 1, n), dtype=bool)
+        np.logical_and.reduceat(held, self._starts, axis=0, out=violated[:-1])
+        np.logical_not(np.isfinite(values).all(axis=0), out=violated[-1])
+        self.latency.record((time.perf_counter() - started) * 1000.0)
+
+        self.evaluations += 1
+        if self.evaluations % RULE_TIMING_EVERY == 0:
+            self._time_rules(fleet, n)
+        return violated
+
+    def _time_rules(self, fleet, n: int):
+        """Evaluate each rule on its own, to see what every rule costs per tick"""
+        for rule, conditions in zip(self.rules, self._rule_slices):
+            started = time.perf_counter()
+            rows = self._rows[conditions]
+            values = np.stack([self.fields[self._used_fields[row]](fleet, n) for row in rows])
+            ok = np.ones(n, dtype=bool)
+            for (_, op, _), value, limit in zip(rule.conditions, values, self._limits[conditions]):
+                ok &= OPERATORS[op](value, limit)
+            self.rule_latency[rule.name].record((time.perf_counter() - started) * 1000.0)
+
+    def check(self, fleet) -> List[Tuple[int, SafetyRule]]:
+        """(fleet index, first violated rule) for every robot breaking a rule"""
+        if fleet.count == 0:
+            return []
+        violated = self.evaluate(fleet)
+        if not violated.any():
+            return []
+        found = []
+        rules = self.rules + [NON_FINITE_RULE]
+        for index in np.flatnonzero(violated.any(axis=0)):
+            rule = rules[int(np.argmax(violated[:, index]))]
+            self.violations[rule.name] += 1
+            found.append((int(index), rule))
+        return found
+
+    def stats(self, tick_budget_ms: float) -> Dict[str, object]:
+        summary = self.latency.summary()
+        return {
+            "rules": len(self.rules),
+            "conditions": len(self._rows),
+            "evaluations": self.evaluations,
+            "tick_budget_ms": tick_budget_ms,
+            "budget_used_p99": summary["p99"] / tick_budget_ms if tick_budget_ms else 0.0,
+            "latency_ms": summary,
+            "rule_latency_ms": {name: stats.summary() for name, stats in self.rule_latency.items()},
+            "violation_ticks": dict(self.violations),  # Robot-ticks spent breaking each rule
+        }
@@ -1,17 +1,91 @@
+import math
+
+import numpy as np
+
 from backend.models.robot_state import RobotState, RobotStatus
+from backend.services.safety_engine import SafetyEngine, SafetyRule
+from backend.services.state_machine import LATCHED_STATES
+from backend.simulator.fleet_simulator import STATUS_INDEX
+from backend.simulator.lift import LIFT_MAX_CM, LIFT_MIN_CM, lift_target
+
+# Limits shared by command validation and the per-tick rule table
+MAX_SPEED = 1.0
+MAX_TURN_RATE = 1.0  # rad/s
+MIN_BATTERY = 10.0  # New commands are refused below this
+CRITICAL_BATTERY = 5.0  # A robot still moving below this is stopped
+# Tip-over: no driving faster than TIP_SPEED with the lift raised above TIP_LIFT_CM
+TIP_LIFT_CM = 120.0
+TIP_SPEED = 0.3
+
+_MOVING = STATUS_INDEX[RobotStatus.MOVING]
+_TURNING = STATUS_INDEX[RobotStatus.TURNING]
+
+# Values the rules can test, per robot, straight from the fleet arrays
+SAFETY_FIELDS = {
+    "moving": lambda fleet, n: ((fleet.status[:n] == _MOVING) | (fleet.status[:n] == _TURNING)).astype(np.float64),
+    "speed": lambda fleet, n: np.abs(fleet.speed[:n]),
+    "turn_rate": lambda fleet, n: np.abs(fleet.turn_rate[:n]),
+    "lift_height": lambda fleet, n: fleet.lift[:n],
+    "lift_target": lambda fleet, n: fleet.lift_target[:n],
+    "battery": lambda fleet, n: fleet.battery[:n],
+}
+
+# Any rule whose conditions all hold puts the robot in ERROR on that tick
+SAFETY_RULES = (
+    SafetyRule("speed_limit", (("speed", ">", MAX_SPEED),),
+               f"Speed above {MAX_SPEED}"),
+    SafetyRule("turn_rate_limit", (("turn_rate", ">", MAX_TURN_RATE),),
+               f"Turn rate above {MAX_TURN_RATE} rad/s"),
+    SafetyRule("lift_over_max", (("lift_height", ">", LIFT_MAX_CM),),
+               f"Lift above {LIFT_MAX_CM:g} cm"),
+    SafetyRule("lift_under_min", (("lift_height", "<", LIFT_MIN_CM),),
+               f"Lift below {LIFT_MIN_CM:g} cm"),
+    SafetyRule("tip_over", (("moving", "==", 1.0), ("lift_height", ">", TIP_LIFT_CM),
+                            ("speed", ">", TIP_SPEED)),
+               f"Driving faster than {TIP_SPEED} with the lift above {TIP_LIFT_CM:g} cm"),
+    SafetyRule("battery_critical", (("moving", "==", 1.0), ("battery", "<", CRITICAL_BATTERY)),
+               f"Moving with battery below {CRITICAL_BATTERY:g}%"),
+)
+
+
+def build_safety_engine() -> SafetyEngine:
+    return SafetyEngine(SAFETY_RULES, SAFETY_FIELDS)
+
 
 class SafetyService:
     def __init__(self):
-        self.max_speed = 1.0
-        self.min_battery = 10.0
+        self.max_speed = MAX_SPEED
+        self.min_battery = MIN_BATTERY
 
     def check_safety(self, state: RobotState) -> bool:
         if state.battery_level < self.min_battery:
             return False
-        if state.status == RobotStatus.ERROR:
+        if state.status in LATCHED_STATES:
             return False
         return True
 
-    def validate_command(self, command: str, value: float) -> bool:
-        # Placeholder for command validation logic
+    def validate_command(self, command: str, value: float, state: RobotState,
+                         lift_command: str = "set") -> bool:
+        """Refuse commands that would break a safety rule before they reach the simulator
+
+        For "lift", lift_command says how value is applied (set, up, down).
+        """
+        # NaN slips through every comparison below, and would poison the fleet arrays
+        if not math.isfinite(value):
+            return False
+        if command == "move":
+            if abs(value) > self.max_speed:
+                return False
+            # Same limit as the tip_over rule, checked before the robot starts driving;
+            # a lift still on its way up counts as already there
+            lift = max(state.lift_height, state.lift_target)
+            return not (lift > TIP_LIFT_CM and abs(value) > TIP_SPEED)
+        if command == "turn":
+            return abs(value) <= MAX_TURN_RATE
+        if command == "lift":
+            if not LIFT_MIN_CM <= value <= LIFT_MAX_CM:
+                return False
+            # The tip_over limit the other way round: no raising it that high while driving fast
+            target = lift_target(lift_command, value, state.lift_target)
+            return not (target > TIP_LIFT_CM and abs(state.speed) > TIP_SPEED)
         return True
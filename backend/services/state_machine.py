@@ -1,22 +1,333 @@
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
 from backend.models.robot_state import RobotStatus
 
+# State codes follow RobotStatus order, here and in the generated firmware enum
+STATES: List[RobotStatus] = list(RobotStatus)
+STATE_INDEX = {status: code for code, status in enumerate(STATES)}
+ANY = tuple(STATES)
+
+IDLE, MOVING, TURNING, LIFT_MOVING, ERROR, EMERGENCY_STOP, CHARGING = (
+    RobotStatus.IDLE, RobotStatus.MOVING, RobotStatus.TURNING, RobotStatus.LIFT_MOVING,
+    RobotStatus.ERROR, RobotStatus.EMERGENCY_STOP, RobotStatus.CHARGING,
+)
+
+# Only a manual reset leaves these; nothing may start moving while in one
+LATCHED_STATES = (ERROR, EMERGENCY_STOP)
+
+# Transitions kept per robot for replaying what led up to an incident
+TRANSITION_LOG_SIZE = int(os.getenv("STATE_TRANSITION_LOG_SIZE", "1024"))
+
+FIRMWARE_HEADER = Path(__file__).resolve().parents[2] / "robot_firmware" / "state_machine" / "state_machine.h"
+
+# hook(from_state, to_state), run on leaving / entering a state
+Hook = Callable[[RobotStatus, RobotStatus], None]
+# guard() -> whether the transition may happen right now
+Guard = Callable[[], bool]
+
+
+class Transition(NamedTuple):
+    """event takes the robot from any of sources to target, if the named guard allows it"""
+    event: str
+    sources: Tuple[RobotStatus, ...]
+    target: RobotStatus
+    guard: Optional[str] = None
+
+
+# The robot state machine. The backend compiles it once at import and
+# `python -m backend.services.state_machine` renders it into the firmware header,
+# so both sides always agree. A source equal to the target is skipped: staying
+# in a state is not a transition.
+GUARDS = ("battery_ok",)
+TRANSITIONS = (
+    Transition("move", (IDLE, TURNING), MOVING, "battery_ok"),
+    Transition("turn", (IDLE,), TURNING, "battery_ok"),
+    Transition("lift", (IDLE,), LIFT_MOVING, "battery_ok"),
+    Transition("stop", (MOVING, TURNING, LIFT_MOVING, CHARGING), IDLE),
+    Transition("charge", (IDLE,), CHARGING),
+    Transition("fault", ANY, ERROR),
+    Transition("emergency_stop", ANY, EMERGENCY_STOP),
+    Transition("reset", (ERROR, EMERGENCY_STOP), IDLE),  # Manual reset
+)
+
+
+class TransitionTable:
+    """Dense (from x to) matrix of transition ids, compiled once from a spec"""
+
+    def __init__(self, transitions: Sequence[Transition], guards: Sequence[str]):
+        self.transitions = list(transitions)
+        self.guards = list(guards)
+        self.events = list(dict.fromkeys(t.event for t in self.transitions))
+        n = len(STATES)
+        matrix = np.full((n, n), -1, dtype=np.int8)
+        for tid, transition in enumerate(self.transitions):
+            if transition.guard is not None and transition.guard not in self.guards:
+                raise ValueError(f"Transition {transition.event}: unknown guard {transition.guard}")
+            target = STATE_INDEX[transition.target]
+            for source in transition.sources:
+                if source == transition.target:
+                    continue
+                previous = matrix[STATE_INDEX[source], target]
+                if previous >= 0:
+                    raise ValueError(f"{source.value} -> {transition.target.value} is declared by both "
+                                     f"{self.transitions[previous].event} and {transition.event}")
+                matrix[STATE_INDEX[source], target] = tid
+        self.matrix = matrix
+        # Flat list copy: one list index per lookup instead of a numpy scalar read
+        self._flat = matrix.ravel().tolist()
+        self._count = n
+
+    def lookup(self, source: int, target: int) -> int:
+        """Transition id for source -> target (state codes), -1 if not allowed"""
+        return self._flat[source * self._count + target]
+
+
+TRANSITION_TABLE = TransitionTable(TRANSITIONS, GUARDS)
+
+
+class TransitionLog:
+    """Fixed-size ring of attempted transitions, stored column-wise in typed arrays
+
+    Rejected attempts are kept too (accepted=False): what the robot was asked
+    to do matters as much as what it did when replaying an incident.
+    """
+
+    def __init__(self, capacity: int = TRANSITION_LOG_SIZE):
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype=np.float64)
+        self.source = np.zeros(capacity, dtype=np.int8)
+        self.target = np.zeros(capacity, dtype=np.int8)
+        self.transition = np.zeros(capacity, dtype=np.int8)  # Transition id, -1 if not in the table
+        self.accepted = np.zeros(capacity, dtype=bool)
+        self.head = 0  # Next slot to write
+        self.size = 0
+
+    def append(self, t: float, source: int, target: int, transition: int, accepted: bool):
+        head = self.head
+        self.t[head] = t
+        self.source[head] = source
+        self.target[head] = target
+        self.transition[head] = transition
+        self.accepted[head] = accepted
+        self.head = (head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def entries(self, until: Optional[float] = None, limit: Optional[int] = None,
+                table: TransitionTable = TRANSITION_TABLE) -> List[Dict[str, object]]:
+        """The last limit transitions at or before until, oldest first"""
+        order = np.arange(self.head - self.size, self.head) % self.capacity
+        if until is not None:
+            order = order[self.t[order] <= until]
+        if limit is not None:
+            order = order[-limit:] if limit > 0 else order[:0]
+        return [
+            {
+                "t": float(self.t[i]),
+                "from": STATES[self.source[i]].value,
+                "to": STATES[self.target[i]].value,
+                "event": table.transitions[self.transition[i]].event if self.transition[i] >= 0 else None,
+                "accepted": bool(self.accepted[i]),
+            }
+            for i in order
+        ]
+
+
 class StateMachine:
-    def __init__(self):
-        self.current_state = RobotStatus.IDLE
+    """One robot's state, moved through the compiled transition table
+
+    Guards are bound by name (unbound guards allow the transition); exit hooks
+    of the old state run before entry hooks of the new one. Every attempt is
+    recorded in the transition log, timestamped with clock().
+    """
+
+    def __init__(self, guards: Optional[Dict[str, Guard]] = None,
+                 on_enter: Optional[Dict[RobotStatus, Hook]] = None,
+                 on_exit: Optional[Dict[RobotStatus, Hook]] = None,
+                 clock: Callable[[], float] = time.time,
+                 table: TransitionTable = TRANSITION_TABLE,
+                 log_size: int = TRANSITION_LOG_SIZE):
+        self.table = table
+        self.clock = clock
+        self._code = STATE_INDEX[RobotStatus.IDLE]
+        guards = guards or {}
+        unknown = set(guards) - set(table.guards)
+        if unknown:
+            raise ValueError(f"Unknown guards: {', '.join(sorted(unknown))}")
+        # Per transition id, so transition_to never looks anything up by name
+        self._guards = [guards.get(t.guard) if t.guard else None for t in table.transitions]
+        self._on_enter = [(on_enter or {}).get(status) for status in STATES]
+        self._on_exit = [(on_exit or {}).get(status) for status in STATES]
+        self.log = TransitionLog(log_size)
+        self.rejected = 0
+
+    @property
+    def current_state(self) -> RobotStatus:
+        return STATES[self._code]
 
     def transition_to(self, new_state: RobotStatus) -> bool:
-        # Define valid transitions
-        valid_transitions = {
-            RobotStatus.IDLE: [RobotStatus.MOVING, RobotStatus.CHARGING, RobotStatus.ERROR],
-            RobotStatus.MOVING: [RobotStatus.IDLE, RobotStatus.ERROR],
-            RobotStatus.CHARGING: [RobotStatus.IDLE, RobotStatus.ERROR],
-            RobotStatus.ERROR: [RobotStatus.IDLE] # Manual reset
-        }
-
-        if new_state in valid_transitions.get(self.current_state, []):
-            self.current_state = new_state
-            return True
-        return False
+        source, target = self._code, STATE_INDEX[new_state]
+        tid = self.table.lookup(source, target)
+        accepted = tid >= 0
+        if accepted:
+            guard = self._guards[tid]
+            accepted = guard is None or guard()
+        self.log.append(self.clock(), source, target, tid, accepted)
+        if not accepted:
+            self.rejected += 1
+            return False
+
+        old_state = STATES[source]
+        exit_hook = self._on_exit[source]
+        if exit_hook is not None:
+            exit_hook(old_state, new_state)
+        self._code = target
+        enter_hook = self._on_enter[target]
+        if enter_hook is not None:
+            enter_hook(old_state, new_state)
+        return True
 
     def get_state(self) -> RobotStatus:
         return self.current_state
+
+    def history(self, until: Optional[float] = None, limit: Optional[int] = None) -> List[Dict[str, object]]:
+        return self.log.entries(until, limit, self.table)
+
+
+def _c_name(name: str) -> str:
+    return name.upper()
+
+
+def _camel(name: str) -> str:
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+def render_firmware_header(table: TransitionTable = TRANSITION_TABLE) -> str:
+    """C++ header with the same states, transition table, guards and hooks as the backend"""
+    state_names = [_c_name(status.name) for status in STATES]
+    lines = [
+        "// Generated from backend/services/state_machine.py; do not edit by hand.",
+        "// Regenerate with: python -m backend.services.state_machine",
+        "#pragma once",
+        "",
+        "#include <stdint.h>",
+        "",
+        "enum class RobotState : uint8_t {",
+        *[f"  {name} = {code}," for code, name in enumerate(state_names)],
+        "};",
+        f"static constexpr uint8_t kRobotStateCount = {len(state_names)};",
+        "",
+        "enum class RobotEvent : uint8_t {",
+        *[f"  {_c_name(event)} = {code}," for code, event in enumerate(table.events)],
+        "};",
+        "",
+        "// Guard 0 means the transition is unconditional",
+        "enum class RobotGuard : uint8_t {",
+        "  NONE = 0,",
+        *[f"  {_c_name(guard)} = {code}," for code, guard in enumerate(table.guards, start=1)],
+        "};",
+        f"static constexpr uint8_t kRobotGuardCount = {len(table.guards) + 1};",
+        "",
+        "struct RobotTransition {",
+        "  RobotState from;",
+        "  RobotState to;",
+        "  RobotEvent event;",
+        "  RobotGuard guard;",
+        "};",
+        "",
+        "// One entry per allowed (from, to) pair; kRobotTransitionTable holds their index",
+        "static constexpr RobotTransition kRobotTransitions[] = {",
+    ]
+    # The firmware has no use for the grouped sources: flatten to one row per table entry
+    ids = {}
+    for source in range(len(STATES)):
+        for target in range(len(STATES)):
+            tid = table.lookup(source, target)
+            if tid < 0:
+                continue
+            ids[(source, target)] = len(ids)
+            transition = table.transitions[tid]
+            guard = _c_name(transition.guard) if transition.guard else "NONE"
+            lines.append(f"  {{RobotState::{state_names[source]}, RobotState::{state_names[target]}, "
+                         f"RobotEvent::{_c_name(transition.event)}, RobotGuard::{guard}}},")
+    lines += [
+        "};",
+        "",
+        "// kRobotTransitionTable[from][to]: index into kRobotTransitions, -1 if not allowed",
+        f"static constexpr int8_t kRobotTransitionTable[kRobotStateCount][kRobotStateCount] = {{",
+        f"  // Columns: {', '.join(state_names)}",
+    ]
+    for source, name in enumerate(state_names):
+        row = ", ".join(f"{ids.get((source, target), -1):>3}" for target in range(len(STATES)))
+        lines.append(f"  {{{row}}},  // {name}")
+    lines += [
+        "};",
+        "",
+        "class RobotStateMachine {",
+        "public:",
+        "  // guard(context) -> whether the transition may happen now",
+        "  using GuardFn = bool (*)(void *context);",
+        "  // hook(from, to, context), run on leaving / entering a state",
+        "  using HookFn = void (*)(RobotState from, RobotState to, void *context);",
+        "",
+        "  explicit RobotStateMachine(void *context = nullptr)",
+        "      : currentState(RobotState::IDLE), context(context), guards(), onEnter(), onExit() {}",
+        "",
+        "  RobotState getState() const { return currentState; }",
+        "",
+        "  void setGuard(RobotGuard guard, GuardFn fn) { guards[static_cast<uint8_t>(guard)] = fn; }",
+        "  void setOnEnter(RobotState state, HookFn fn) { onEnter[static_cast<uint8_t>(state)] = fn; }",
+        "  void setOnExit(RobotState state, HookFn fn) { onExit[static_cast<uint8_t>(state)] = fn; }",
+        "",
+        "  // Unbound guards allow the transition; staying in the current state is not a transition",
+        "  bool transition(RobotState newState) {",
+        "    const uint8_t from = static_cast<uint8_t>(currentState);",
+        "    const uint8_t to = static_cast<uint8_t>(newState);",
+        "    const int8_t id = kRobotTransitionTable[from][to];",
+        "    if (id < 0) {",
+        "      return false;",
+        "    }",
+        "    const GuardFn guard = guards[static_cast<uint8_t>(kRobotTransitions[id].guard)];",
+        "    if (guard != nullptr && !guard(context)) {",
+        "      return false;",
+        "    }",
+        "    const RobotState oldState = currentState;",
+        "    if (onExit[from] != nullptr) {",
+        "      onExit[from](oldState, newState, context);",
+        "    }",
+        "    currentState = newState;",
+        "    if (onEnter[to] != nullptr) {",
+        "      onEnter[to](oldState, newState, context);",
+        "    }",
+        "    return true;",
+        "  }",
+        "",
+        "private:",
+        "  RobotState currentState;",
+        "  void *context;",
+        "  GuardFn guards[kRobotGuardCount];",
+        "  HookFn onEnter[kRobotStateCount];",
+        "  HookFn onExit[kRobotStateCount];",
+        "};",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    # python -m backend.services.state_machine [--check]
+    header = render_firmware_header()
+    if "--check" in sys.argv[1:]:
+        current = FIRMWARE_HEADER.read_text() if FIRMWARE_HEADER.exists() else ""
+        if current != header:
+            print(f"{FIRMWARE_HEADER} is out of date; run python -m backend.services.state_machine")
+            sys.exit(1)
+        print(f"{FIRMWARE_HEADER} is up to date")
+    else:
+        FIRMWARE_HEADER.write_text(header)
+        print(f"Wrote {FIRMWARE_HEADER}")
@@ -0,0 +1,110 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.simulator.fleet_simulator import STATUS_CODES
+
+# Sampling rate and in-memory retention per robot. 1 h at 10 Hz is ~1 MB, so a
+# 1000-robot fleet holds ~1 GB; older samples are in the history database
+HISTORY_RATE_HZ = float(os.getenv("TELEMETRY_HISTORY_HZ", "10"))
+HISTORY_SECONDS = float(os.getenv("TELEMETRY_HISTORY_SECONDS", "3600"))
+HISTORY_CAPACITY = int(HISTORY_RATE_HZ * HISTORY_SECONDS)
+
+# Numeric series stored per sample, in row order of TelemetryRing.values
+FIELDS = ("x", "y", "theta", "battery_level", "lift_height")
+
+# Queries without an explicit resolution are bucketed down to about this many points
+DEFAULT_POINTS = 500
+
+
+class TelemetryRing:
+    """Fixed-size ring of telemetry samples, stored column-wise in typed arrays
+
+    Memory is allocated once up front and never grows; once full, the oldest
+    samples are overwritten.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        if capacity is None:
+            capacity = HISTORY_CAPACITY
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((len(FIELDS), capacity), dtype=np.float32)
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.head = 0  # Next slot to write
+        self.size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.t.nbytes + self.values.nbytes + self.status.nbytes
+
+    def append(self, t: float, values: np.ndarray, status: int):
+        """Store one sample; values holds one entry per FIELDS"""
+        head = self.head
+        self.t[head] = t
+        self.values[:, head] = values
+        self.status[head] = status
+        self.head = (head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def window(self, since: float, until: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Samples with since <= t < until, oldest first"""
+        # The ring is two time-ordered segments: [head, size) is older than [0, head)
+        if self.size < self.capacity:
+            segments = [(0, self.size)]
+        else:
+            segments = [(self.head, self.capacity), (0, self.head)]
+
+        slices = []
+        for start, stop in segments:
+            times = self.t[start:stop]
+            lo = start + int(np.searchsorted(times, since, side="left"))
+            hi = start + int(np.searchsorted(times, until, side="left"))
+            if hi > lo:
+                slices.append(slice(lo, hi))
+
+        if len(slices) == 1:
+            s = slices[0]
+            return self.t[s], self.values[:, s], self.status[s]
+        return (
+            np.concatenate([self.t[s] for s in slices]) if slices else self.t[:0],
+            np.concatenate([self.values[:, s] for s in slices], axis=1) if slices else self.values[:, :0],
+            np.concatenate([self.status[s] for s in slices]) if slices else self.status[:0],
+        )
+
+    def downsample(self, since: float, until: float,
+                   resolution: Optional[float] = None) -> Dict[str, Any]:
+        """min/max/mean of every series per resolution-second bucket"""
+        if resolution is None or resolution <= 0:
+            resolution = max((until - since) / DEFAULT_POINTS, 1.0 / HISTORY_RATE_HZ)
+
+        t, values, status = self.window(since, until)
+        result: Dict[str, Any] = {"resolution": resolution, "t": [], "status": [], "series": {}}
+        if t.size == 0:
+            result["series"] = {name: {"min": [], "max": [], "mean": []} for name in FIELDS}
+            return result
+
+        # Samples are time-ordered, so each bucket is a contiguous run
+        bucket = ((t - since) // resolution).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+        counts = np.diff(np.append(starts, t.size))
+
+        mins = np.minimum.reduceat(values, starts, axis=1)
+        maxs = np.maximum.reduceat(values, starts, axis=1)
+        means = np.add.reduceat(values, starts, axis=1, dtype=np.float64) / counts
+        # Status at the end of each bucket
+        last_status = status[np.append(starts[1:], t.size) - 1]
+
+        result["t"] = (since + bucket[starts] * resolution).tolist()
+        result["status"] = [STATUS_CODES[code].value for code in last_status]
+        result["series"] = {
+            name: {
+                "min": mins[row].tolist(),
+                "max": maxs[row].tolist(),
+                "mean": means[row].tolist(),
+            }
+            for row, name in enumerate(FIELDS)
+        }
+        return result
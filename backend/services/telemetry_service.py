@@ -0,0 +1,171 @@
+import asyncio
+import json
+import math
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from backend.models.robot_state import RobotState
+
+# Clients pick their own rate; anything faster than the simulator tick is pointless
+MIN_RATE_HZ = 0.5
+MAX_RATE_HZ = 10.0
+DEFAULT_RATE_HZ = 5.0
+
+# Frames a slow client may fall behind before it is resynced with a full snapshot
+SUBSCRIBER_BACKLOG = 16
+
+_MISSING = object()
+
+
+def flatten_state(state: RobotState) -> Dict[str, Any]:
+    """Flatten a RobotState into the field dict sent over the wire"""
+    # Round away float noise so unchanged values do not show up in every delta
+    return {
+        "status": state.status.value,
+        "x": round(state.position.x, 3),
+        "y": round(state.position.y, 3),
+        "theta": round(state.position.theta, 3),
+        "battery_level": round(state.battery_level, 2),
+        "lift_height": round(state.lift_height, 1),
+        "lift_target": round(state.lift_target, 1),
+        "error_message": state.error_message,
+    }
+
+
+def _encode_frame(seq: int, fields: Dict[str, Any], full: bool) -> str:
+    return json.dumps({"seq": seq, "ts": time.time(), "full": full, "fields": fields})
+
+
+class TelemetrySubscription:
+    """One connected client; receives pre-encoded frames from its rate group"""
+
+    def __init__(self, hub: "TelemetryHub", group: "_RateGroup"):
+        self.hub = hub
+        self.group = group
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        self.needs_resync = True  # First frame is always a full snapshot
+
+    def push(self, frame: str):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Client is too slow: drop the backlog and send a full snapshot next
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.needs_resync = True
+
+    async def frames(self) -> AsyncIterator[str]:
+        while True:
+            if self.needs_resync:
+                self.needs_resync = False
+                snapshot = self.hub.snapshot()
+                # Without a snapshot nothing was published yet, and the group's
+                # first delta (against no previous fields) carries every field
+                if snapshot is not None:
+                    while not self.queue.empty():
+                        self.queue.get_nowait()
+                    # The snapshot can be newer than the group's diff base; the group's
+                    # next frame is full, so a field changing back to its base value is not lost
+                    self.group.send_full = True
+                    yield _encode_frame(self.group.seq, snapshot, full=True)
+            yield await self.queue.get()
+
+
+class _RateGroup:
+    """Subscribers sharing a rate; each delta is computed and encoded once per group"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_emit = 0.0
+        self.last_fields: Dict[str, Any] = {}
+        self.send_full = False  # Next frame carries every field (a subscriber just resynced)
+        self.seq = 0
+        self.subscribers: Set[TelemetrySubscription] = set()
+
+
+class TelemetryHub:
+    """Fan-out of robot state changes to WebSocket/SSE subscribers"""
+
+    def __init__(self):
+        self._groups: Dict[float, _RateGroup] = {}
+        self._state: Optional[RobotState] = None
+        # Current state on demand; set by the owning RobotService. Without it the
+        # snapshot is the last published state, which is stale while nobody watched
+        self.state_source: Optional[Callable[[], RobotState]] = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._groups)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(g.subscribers) for g in self._groups.values())
+
+    def _group_for(self, rate_hz: float) -> _RateGroup:
+        # NaN passes the clamp (every comparison is false) and would key a new group each time
+        if not math.isfinite(rate_hz):
+            rate_hz = DEFAULT_RATE_HZ
+        rate_hz = min(max(rate_hz, MIN_RATE_HZ), MAX_RATE_HZ)
+        interval = round(1.0 / rate_hz, 3)
+        group = self._groups.get(interval)
+        if group is None:
+            group = self._groups[interval] = _RateGroup(interval)
+        return group
+
+    def subscribe(self, rate_hz: float = DEFAULT_RATE_HZ) -> TelemetrySubscription:
+        group = self._group_for(rate_hz)
+        subscription = TelemetrySubscription(self, group)
+        group.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TelemetrySubscription):
+        group = subscription.group
+        group.subscribers.discard(subscription)
+        if not group.subscribers:
+            self._groups.pop(group.interval, None)
+
+    def set_rate(self, subscription: TelemetrySubscription, rate_hz: float):
+        """Move a client to a different rate group and resync it"""
+        self.unsubscribe(subscription)
+        subscription.group = self._group_for(rate_hz)
+        subscription.group.subscribers.add(subscription)
+        subscription.needs_resync = True
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Full field dict of the current (or last published) state, if any"""
+        if self.state_source is not None:
+            self._state = self.state_source()
+        return flatten_state(self._state) if self._state is not None else None
+
+    def publish(self, state: RobotState, urgent: bool = False):
+        """Called from the simulator tick with the current robot state
+
+        urgent (status changes) skips the per-group rate limit.
+        """
+        self._state = state
+        if not self._groups:
+            return  # Nobody is listening; skip the flatten entirely
+
+        fields = flatten_state(state)
+        now = time.monotonic()
+        for group in self._groups.values():
+            if not urgent and now - group.last_emit < group.interval:
+                continue
+            full = group.send_full
+            if full:
+                group.send_full = False
+                delta = fields
+            else:
+                delta = {
+                    key: value
+                    for key, value in fields.items()
+                    if group.last_fields.get(key, _MISSING) != value
+                }
+            group.last_emit = now
+            if not delta:
+                continue
+            group.last_fields = fields
+            group.seq += 1
+            frame = _encode_frame(group.seq, delta, full=full)
+            for subscription in group.subscribers:
+                subscription.push(frame)
@@ -0,0 +1,174 @@
+import math
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+SLOT_BITS = 8
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4  # 256**4 ticks: about 500 days at 10 ms per tick
+
+TimerCallback = Callable[[Hashable], Any]
+
+
+class _Timer:
+    __slots__ = ("key", "deadline", "slot_deadline", "callback", "level", "slot")
+
+    def __init__(self, key: Hashable, deadline: int, callback: TimerCallback):
+        self.key = key
+        self.deadline = deadline  # Tick at which the timer fires
+        self.slot_deadline = deadline  # Deadline it was filed under (<= deadline)
+        self.callback = callback
+        self.level = 0
+        self.slot: Optional[Dict[Hashable, "_Timer"]] = None
+
+
+class TimerWheel:
+    """Hierarchical hashed timer wheel with O(1) arm, re-arm and cancel
+
+    Timers live in one of LEVELS wheels of 256 slots; level L slots are
+    256**L ticks wide. A timer is filed at the lowest level whose span still
+    contains its deadline and cascades down a level each time the wheel below
+    wraps, so advancing costs O(1) per tick plus the timers that expire.
+
+    Re-arming later (a watchdog kick) only moves the deadline: the timer stays
+    in its slot and is re-filed when that slot comes up. A robot kicked at
+    20 Hz is therefore re-filed about once per timeout, not once per kick.
+    """
+
+    def __init__(self, tick_s: float, start: float = 0.0):
+        self.tick_s = tick_s
+        self.start = start
+        self.current = 0  # Last tick processed
+        self._wheels: List[List[Dict[Hashable, _Timer]]] = [
+            [{} for _ in range(SLOTS)] for _ in range(LEVELS)
+        ]
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._filed = [0] * LEVELS  # Timers per level, to skip over empty stretches
+        self.armed = 0  # arm() calls
+        self.refiled = 0  # Timers moved to a new slot because their deadline changed
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def _tick_at(self, t: float) -> int:
+        return int((t - self.start) / self.tick_s)
+
+    def arm(self, key: Hashable, delay_s: float, callback: TimerCallback):
+        """Fire callback(key) once delay_s from now, replacing any timer armed under key"""
+        self.armed += 1
+        deadline = self.current + max(1, math.ceil(delay_s / self.tick_s))
+        timer = self._timers.get(key)
+        if timer is None:
+            timer = self._timers[key] = _Timer(key, deadline, callback)
+            self._file(timer)
+            return
+        timer.callback = callback
+        timer.deadline = deadline
+        if deadline < timer.slot_deadline:
+            # Earlier than the slot it sits in: it has to move now
+            self.refiled += 1
+            self._unfile(timer)
+            self._file(timer)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        self._unfile(timer)
+        return True
+
+    def advance(self, now: float):
+        """Process every tick up to now, firing the timers that are due"""
+        target = self._tick_at(now)
+        if not self._timers:
+            # Nothing to cascade or fire; jump straight there
+            self.current = max(self.current, target)
+            return
+        while self.current < target:
+            # With the lowest wheels empty nothing happens before the next wrap of
+            # the first non-empty one; jump to just before it
+            level = 0
+            while self._filed[level] == 0:
+                level += 1
+            if level:
+                span = 1 << (SLOT_BITS * level)
+                self.current = min(target, (self.current // span + 1) * span - 1)
+                if self.current == target:
+                    return
+            self.current += 1
+            tick = self.current
+            # Cascade when a wheel wraps, from the top down so timers settle at the right level
+            for level in range(LEVELS - 1, 0, -1):
+                if tick & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    self._cascade(level, (tick >> (SLOT_BITS * level)) & SLOT_MASK)
+            self._fire(self._wheels[0][tick & SLOT_MASK])
+            if not self._timers:
+                self.current = max(self.current, target)
+                return
+
+    def _file(self, timer: _Timer, due_now: bool = False):
+        # Outside advance() the current tick is done, so the earliest slot is the next one;
+        # a cascade runs before the current slot fires, so it may file into it
+        deadline = max(timer.deadline, self.current if due_now else self.current + 1)
+        timer.slot_deadline = deadline
+        level = 0
+        # Lowest level where the deadline shares every higher digit with the current tick
+        while level < LEVELS - 1 and (deadline ^ self.current) >> (SLOT_BITS * (level + 1)):
+            level += 1
+        slot = self._wheels[level][(deadline >> (SLOT_BITS * level)) & SLOT_MASK]
+        slot[timer.key] = timer
+        timer.slot = slot
+        timer.level = level
+        self._filed[level] += 1
+
+    def _unfile(self, timer: _Timer):
+        if timer.slot is not None:
+            del timer.slot[timer.key]
+            timer.slot = None
+            self._filed[timer.level] -= 1
+
+    def _cascade(self, level: int, index: int):
+        slot = self._wheels[level][index]
+        if not slot:
+            return
+        timers = list(slot.values())
+        slot.clear()
+        self._filed[level] -= len(timers)
+        for timer in timers:
+            self._file(timer, due_now=True)
+
+    def _fire(self, slot: Dict[Hashable, _Timer]):
+        if not slot:
+            return
+        timers = list(slot.values())
+        slot.clear()
+        self._filed[0] -= len(timers)
+        # Unfile them all before any callback runs: a callback may cancel or re-arm
+        # another timer from this slot
+        for timer in timers:
+            timer.slot = None
+        for timer in timers:
+            if self._timers.get(timer.key) is not timer:
+                continue  # Cancelled (or replaced) by an earlier callback
+            if timer.slot is not None:
+                continue  # Re-armed earlier by a callback, already filed again
+            if timer.deadline > self.current:
+                # Kicked since it was filed: file it again under the new deadline
+                self.refiled += 1
+                self._file(timer)
+                continue
+            del self._timers[timer.key]
+            self.expired += 1
+            timer.callback(timer.key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._timers),
+            "tick_ms": self.tick_s * 1000.0,
+            "armed": self.armed,
+            "refiled": self.refiled,
+            "expired": self.expired,
+        }
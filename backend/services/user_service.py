@@ -1,52 +1,53 @@
-from typing import Optional
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+import os
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import AsyncSessionLocal
 from backend.models.user import User, UserCreate, UserUpdate
 from backend.models.database_models import User as DBUser
+from backend.services.lru_cache import LRUCache
+from backend.services.password_hasher import password_hasher
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated users by id, so token checks on the control path skip the database.
+# update_user invalidates; the TTL bounds staleness of changes made elsewhere.
+user_cache: LRUCache[User] = LRUCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL_S", "300")),
+)
+
+
+async def get_cached_user(user_id: int) -> Optional[User]:
+    """User by id from user_cache; the database is only hit on a cache miss"""
+    user = user_cache.get(user_id)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = await UserService(db).get_user_by_id(user_id)
+        if user is not None:
+            user_cache.set(user_id, user)
+    return user
 
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def _hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        # Bcrypt has a 72-byte limit, validate before hashing
-        password_bytes = password.encode('utf-8')
-        password_byte_length = len(password_bytes)
-        
-        if password_byte_length > 72:
-            raise ValueError("Password cannot exceed 72 characters. Please choose a shorter password.")
-        
-        try:
-            return pwd_context.hash(password)
-        except Exception as e:
-            # Catch any password hashing errors (including passlib's 72-byte limit)
-            error_msg = str(e).lower()
-            # Only treat as 72-byte error if password is actually > 72 bytes OR error explicitly mentions it
-            # This prevents false positives from other errors
-            is_72_byte_error = (
-                password_byte_length > 72 or
-                ("72" in error_msg and ("byte" in error_msg or "character" in error_msg or "truncate" in error_msg))
-            )
-            
-            if is_72_byte_error:
-                raise ValueError("Password cannot exceed 72 characters. Please choose a shorter password.")
-            # Re-raise other errors as-is
-            raise
+    async def _hash_password(self, password: str) -> str:
+        """Hash a password using bcrypt (on the hasher's worker pool)"""
+        return await password_hasher.hash(password)
+    
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash (on the hasher's worker pool)"""
+        return await password_hasher.verify(plain_password, hashed_password)
     
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against a hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    async def _get_db_user(self, *criteria) -> Optional[DBUser]:
+        result = await self.db.execute(select(DBUser).where(*criteria))
+        return result.scalars().first()
     
-    def create_user(self, user_data: UserCreate) -> User:
+    async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user with hashed password"""
         db_user = DBUser(
             username=user_data.username,
-            password_hash=self._hash_password(user_data.password),
+            password_hash=await self._hash_password(user_data.password),
             name=user_data.name,
             email=user_data.email,
             business_name=user_data.business_name,
@@ -55,32 +56,52 @@ class UserService:
             is_active=True,
         )
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         return self._db_to_pydantic(db_user)
     
-    def get_user_by_username(self, username: str) -> Optional[User]:
+    async def create_users(self, users: List[UserCreate]) -> List[User]:
+        """Create many users at once, hashing their passwords on every core"""
+        hashes = await password_hasher.hash_many([u.password for u in users])
+        db_users = [
+            DBUser(
+                username=user_data.username,
+                password_hash=password_hash,
+                name=user_data.name,
+                email=user_data.email,
+                business_name=user_data.business_name,
+                business_address=user_data.business_address,
+                phone=user_data.phone,
+                is_active=True,
+            )
+            for user_data, password_hash in zip(users, hashes)
+        ]
+        self.db.add_all(db_users)
+        await self.db.commit()
+        return [self._db_to_pydantic(db_user) for db_user in db_users]
+    
+    async def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
-        db_user = self.db.query(DBUser).filter(DBUser.username == username).first()
+        db_user = await self._get_db_user(DBUser.username == username)
         return self._db_to_pydantic(db_user) if db_user else None
     
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        db_user = self.db.query(DBUser).filter(DBUser.id == user_id).first()
+        db_user = await self._get_db_user(DBUser.id == user_id)
         return self._db_to_pydantic(db_user) if db_user else None
     
-    def verify_password(self, username: str, password: str) -> Optional[User]:
+    async def verify_password(self, username: str, password: str) -> Optional[User]:
         """Verify user credentials and return user if valid"""
-        db_user = self.db.query(DBUser).filter(DBUser.username == username).first()
+        db_user = await self._get_db_user(DBUser.username == username)
         if not db_user:
             return None
-        if not self._verify_password(password, db_user.password_hash):
+        if not await self._verify_password(password, db_user.password_hash):
             return None
         return self._db_to_pydantic(db_user)
     
-    def update_user(self, user_id: int, updates: UserUpdate) -> Optional[User]:
+    async def update_user(self, user_id: int, updates: UserUpdate) -> Optional[User]:
         """Update user information"""
-        db_user = self.db.query(DBUser).filter(DBUser.id == user_id).first()
+        db_user = await self._get_db_user(DBUser.id == user_id)
         if not db_user:
             return None
         
@@ -88,8 +109,9 @@ class UserService:
         for key, value in update_dict.items():
             setattr(db_user, key, value)
         
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        user_cache.invalidate(user_id)
         return self._db_to_pydantic(db_user)
     
     def _db_to_pydantic(self, db_user: DBUser) -> User:
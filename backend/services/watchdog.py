@@ -0,0 +1,59 @@
+import logging
+import os
+from typing import Any, Dict, Hashable
+
+from backend.services.timer_wheel import TimerWheel
+
+# A robot that hears nothing from its operator for this long is stopped
+WATCHDOG_TIMEOUT_S = float(os.getenv("WATCHDOG_TIMEOUT_MS", "2000")) / 1000.0
+WATCHDOG_TICK_S = 0.01
+
+
+class CommandWatchdog:
+    """Stops robots whose operator went quiet
+
+    Every accepted motion command kicks the robot's timer; stop and emergency
+    stop disarm it. The deadlines live in one timer wheel shared by the
+    fleet, advanced from the simulator tick on the operators' clock (real
+    time for people, whatever SIM_CLOCK says).
+    """
+
+    def __init__(self, start: float = 0.0, timeout_s: float = WATCHDOG_TIMEOUT_S,
+                 tick_s: float = WATCHDOG_TICK_S):
+        self.timeout_s = timeout_s
+        self.wheel = TimerWheel(tick_s, start=start)
+        self._robots: Dict[Hashable, Any] = {}  # key -> RobotService
+        self.kicks = 0
+        self.stops = 0
+
+    def kick(self, key: Hashable, robot):
+        self.kicks += 1
+        self._robots[key] = robot
+        self.wheel.arm(key, self.timeout_s, self._expired)
+
+    def disarm(self, key: Hashable):
+        self.wheel.cancel(key)
+
+    def advance(self, now: float):
+        self.wheel.advance(now)
+
+    def _expired(self, key: Hashable):
+        robot = self._robots.get(key)
+        if robot is None:
+            return
+        self.stops += 1
+        print(f"[WATCHDOG] No command from the operator of {key} for "
+              f"{self.timeout_s * 1000:.0f} ms, stopping")
+        try:
+            robot.watchdog_expired()
+        except Exception:
+            # One robot failing to stop must not keep the others' timers from firing
+            logging.exception(f"Watchdog stop of {key} failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "timeout_ms": self.timeout_s * 1000.0,
+            "kicks": self.kicks,
+            "stops": self.stops,
+            **self.wheel.stats(),
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import List, Optional, Tuple
+
+# Simulated wall-clock time starts here for clocks that do not follow the real one
+DEFAULT_EPOCH = 1_700_000_000.0
+
+
+class Clock:
+    """Real time; the base for every simulation clock
+
+    Everything that simulates or supervises robots reads time and sleeps
+    through a clock instead of the time/asyncio modules, so the same code can
+    run in real time, sped up, or as a discrete-event simulation.
+    now() is wall-clock seconds (for timestamps), monotonic() is for
+    intervals and deadlines.
+    """
+
+    rate = 1.0  # Simulated seconds per real second (inf for discrete time)
+
+    def now(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds))
+
+    async def sleep_until(self, deadline: float):
+        """Sleep until monotonic() reaches deadline"""
+        await self.sleep(deadline - self.monotonic())
+
+    def sleep_sync(self, seconds: float):
+        """Blocking sleep for code running outside the event loop"""
+        time.sleep(max(0.0, seconds))
+
+    def describe(self) -> str:
+        return "real"
+
+
+class RealClock(Clock):
+    pass
+
+
+class ScaledClock(Clock):
+    """Real time multiplied by a constant factor (100 runs a minute in 0.6 s)"""
+
+    def __init__(self, rate: float, epoch: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Clock rate must be positive")
+        self.rate = rate
+        self._real_start = time.monotonic()
+        self._epoch = epoch if epoch is not None else time.time()
+
+    def monotonic(self) -> float:
+        return (time.monotonic() - self._real_start) * self.rate
+
+    def now(self) -> float:
+        return self._epoch + self.monotonic()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds) / self.rate)
+
+    def sleep_sync(self, seconds: float):
+        time.sleep(max(0.0, seconds) / self.rate)
+
+    def describe(self) -> str:
+        return f"scaled:{self.rate:g}"
+
+
+class DiscreteClock(Clock):
+    """Discrete-event time: runs as fast as the CPU allows
+
+    Time only moves when every sleeper is waiting on the clock; it then jumps
+    straight to the earliest deadline and wakes that sleeper. Coroutines that
+    wait on anything else (sockets, threads) do not hold time back, so this
+    mode is for headless runs where the clock is the only thing awaited.
+    """
+
+    rate = float("inf")
+
+    def __init__(self, epoch: float = DEFAULT_EPOCH):
+        self._epoch = epoch
+        self._now = 0.0
+        self._seq = itertools.count()  # Keeps equal deadlines in FIFO order
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._driver: Optional[asyncio.Task] = None
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def now(self) -> float:
+        return self._epoch + self._now
+
+    def advance(self, seconds: float):
+        """Move time forward by hand (synchronous stepping, tests)"""
+        self._now += max(0.0, seconds)
+
+    async def sleep(self, seconds: float):
+        await self.sleep_until(self._now + max(0.0, seconds))
+
+    async def sleep_until(self, deadline: float):
+        if deadline <= self._now:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (deadline, next(self._seq), future))
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._drive())
+        await future
+
+    def sleep_sync(self, seconds: float):
+        self.advance(seconds)
+
+    async def _drive(self):
+        while True:
+            # Let every runnable coroutine reach its next sleep before time moves
+            await asyncio.sleep(0)
+            if not self._sleepers:
+                return
+            deadline, _, future = heapq.heappop(self._sleepers)
+            if future.done():  # Cancelled sleeper
+                continue
+            self._now = max(self._now, deadline)
+            future.set_result(None)
+
+    def describe(self) -> str:
+        return "discrete"
+
+
+def make_clock(spec: str) -> Clock:
+    """Clock from a "real" or "scaled:<rate>" spec
+
+    DiscreteClock is not on offer: the live API awaits sockets and threads, so
+    the fleet loop would free-run simulated hours per second. Headless runs
+    (shift.py, tests) construct one directly.
+    """
+    kind, _, arg = spec.strip().lower().partition(":")
+    if kind == "real":
+        return RealClock()
+    if kind == "scaled":
+        return ScaledClock(float(arg or "100"))
+    if kind == "discrete":
+        raise ValueError("SIM_CLOCK=discrete is only valid headless (python -m backend.simulator.shift)")
+    raise ValueError(f"Unknown clock: {spec}")
+
+
+# Clock shared by the fleet simulator, robot services and watchdogs (SIM_CLOCK=scaled:100 for demos)
+sim_clock = make_clock(os.getenv("SIM_CLOCK", "real"))
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.models.robot_state import RobotState, RobotStatus, RobotPosition
+from backend.simulator.clock import Clock, sim_clock
+from backend.simulator.lift import lift_step, lift_target
+from backend.simulator.robot_simulator import BATTERY_DRAIN_PER_S
+
+DEFAULT_TICK_HZ = 50.0
+INITIAL_CAPACITY = 64
+MAX_CATCH_UP_TICKS = 1000
+
+# Robot status is stored as a small integer code into this list
+STATUS_CODES: List[RobotStatus] = list(RobotStatus)
+STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+_MOVING = STATUS_INDEX[RobotStatus.MOVING]
+_TURNING = STATUS_INDEX[RobotStatus.TURNING]
+
+TickListener = Callable[["FleetSimulator", float], None]
+LiftArrival = Callable[[float], None]  # Called with the height the lift settled at
+
+
+class FleetRobotView:
+    """Per-robot handle onto the fleet arrays, compatible with RobotSimulator"""
+
+    def __init__(self, fleet: "FleetSimulator", index: int):
+        self.fleet = fleet
+        self.index = index
+        # Called after every status change, so the owner can push it without waiting for a tick
+        self.on_status_changed: Optional[Callable[[], None]] = None
+
+    @property
+    def clock(self) -> Clock:
+        return self.fleet.clock
+
+    async def start(self):
+        # The fleet runs a single loop for every robot; starting one robot starts it
+        await self.fleet.start()
+
+    async def stop(self):
+        # Stopping one robot must not stop the shared loop
+        pass
+
+    def get_state(self) -> RobotState:
+        fleet, i = self.fleet, self.index
+        return RobotState(
+            status=STATUS_CODES[fleet.status[i]],
+            position=RobotPosition(
+                x=float(fleet.x[i]), y=float(fleet.y[i]), theta=float(fleet.angle[i])
+            ),
+            battery_level=float(fleet.battery[i]),
+            speed=float(fleet.speed[i]),
+            lift_height=float(fleet.lift[i]),
+            lift_target=float(fleet.lift_target[i]),
+        )
+
+    def update_status(self, status: RobotStatus):
+        self.fleet.status[self.index] = STATUS_INDEX[status]
+        if self.on_status_changed is not None:
+            self.on_status_changed()
+
+    def set_speed(self, speed: float):
+        self.fleet.speed[self.index] = speed
+
+    def set_turn_rate(self, turn_rate: float):
+        self.fleet.turn_rate[self.index] = turn_rate
+
+    def command_lift(self, command: str, height_cm: float):
+        """Start a set/up/down lift move; the tick loop carries it out"""
+        fleet, i = self.fleet, self.index
+        fleet.lift_target[i] = lift_target(command, height_cm, float(fleet.lift_target[i]))
+
+    def halt_lift(self):
+        fleet, i = self.fleet, self.index
+        fleet.lift_target[i] = fleet.lift[i]
+        fleet.lift_velocity[i] = 0.0
+
+    @property
+    def lift_height(self) -> float:
+        return float(self.fleet.lift[self.index])
+
+    @property
+    def lift_moving(self) -> bool:
+        fleet, i = self.fleet, self.index
+        return bool(fleet.lift[i] != fleet.lift_target[i] or fleet.lift_velocity[i] != 0)
+
+    @property
+    def on_lift_arrived(self) -> Optional[LiftArrival]:
+        return self.fleet.lift_arrivals.get(self.index)
+
+    @on_lift_arrived.setter
+    def on_lift_arrived(self, callback: Optional[LiftArrival]):
+        if callback is None:
+            self.fleet.lift_arrivals.pop(self.index, None)
+        else:
+            self.fleet.lift_arrivals[self.index] = callback
+
+
+class FleetSimulator:
+    """Simulates many robots at once with one batched kinematic update per tick"""
+
+    def __init__(self, tick_hz: float = DEFAULT_TICK_HZ, capacity: int = INITIAL_CAPACITY,
+                 clock: Clock = sim_clock):
+        self.clock = clock
+        self.tick_hz = tick_hz
+        self.dt = 1.0 / tick_hz
+        self.count = 0
+        self._allocate(capacity)
+        self._listeners: List[TickListener] = []
+        # Fleet index -> callback run when that robot's lift settles on its target
+        self.lift_arrivals: Dict[int, LiftArrival] = {}
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+        # Loop health, so tick budget overruns are visible
+        self.ticks = 0
+        self.overruns = 0
+        self.last_step_ms = 0.0
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate the state arrays, keeping existing robots"""
+        def grow(old: Optional[np.ndarray], dtype) -> np.ndarray:
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[: self.count] = old[: self.count]
+            return new
+
+        self.capacity = capacity
+        self.x = grow(getattr(self, "x", None), np.float64)
+        self.y = grow(getattr(self, "y", None), np.float64)
+        self.angle = grow(getattr(self, "angle", None), np.float64)
+        self.speed = grow(getattr(self, "speed", None), np.float64)
+        self.turn_rate = grow(getattr(self, "turn_rate", None), np.float64)
+        self.lift = grow(getattr(self, "lift", None), np.float64)
+        self.lift_target = grow(getattr(self, "lift_target", None), np.float64)
+        self.lift_velocity = grow(getattr(self, "lift_velocity", None), np.float64)
+        self.battery = grow(getattr(self, "battery", None), np.float64)
+        self.status = grow(getattr(self, "status", None), np.int8)
+
+    def add_robot(self, x: float = 0.0, y: float = 0.0, angle: float = 0.0,
+                  battery: float = 100.0) -> int:
+        """Add a robot and return its index in the fleet arrays"""
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i], self.y[i], self.angle[i] = x, y, angle
+        self.battery[i] = battery
+        self.status[i] = STATUS_INDEX[RobotStatus.IDLE]
+        self.count += 1
+        return i
+
+    def view(self, index: int) -> FleetRobotView:
+        if not 0 <= index < self.count:
+            raise IndexError(f"No robot at fleet index {index}")
+        return FleetRobotView(self, index)
+
+    def add_tick_listener(self, listener: TickListener):
+        """Register a callback run after every step as listener(fleet, dt)"""
+        self._listeners.append(listener)
+
+    def step(self, dt: float):
+        """Advance every robot by dt seconds"""
+        n = self.count
+        if n == 0:
+            return
+
+        # Time each robot actually spends moving this tick (0 for stationary robots);
+        # a robot turning on the spot has no speed, so it only rotates
+        status = self.status[:n]
+        active = ((status == _MOVING) | (status == _TURNING)) * dt
+
+        angle = self.angle[:n]
+        angle += self.turn_rate[:n] * active
+        travel = self.speed[:n] * active
+        self.x[:n] += np.cos(angle) * travel
+        self.y[:n] += np.sin(angle) * travel
+
+        # Lifts follow their trapezoidal profiles; arrivals are reported after the step.
+        # Most ticks no lift is travelling, so check that before the full profile update
+        lift, lift_target, lift_velocity = self.lift[:n], self.lift_target[:n], self.lift_velocity[:n]
+        arrived = None
+        if lift_velocity.any() or not np.array_equal(lift, lift_target):
+            self.lift[:n], self.lift_velocity[:n], arrived = lift_step(lift, lift_velocity, lift_target, dt)
+
+        battery = self.battery[:n]
+        battery -= BATTERY_DRAIN_PER_S * dt
+        np.maximum(battery, 0.0, out=battery)
+
+        if arrived is not None and arrived.any():
+            for i in np.flatnonzero(arrived):
+                callback = self.lift_arrivals.get(int(i))
+                if callback is None:
+                    continue
+                try:
+                    callback(float(self.lift[i]))
+                except Exception:
+                    # A failing listener must not take down the shared simulator loop
+                    logging.exception(f"Lift arrival callback for robot {i} failed")
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def tick(self):
+        """One fixed step plus the tick listeners"""
+        started = time.perf_counter()
+        self.step(self.dt)
+        for listener in self._listeners:
+            try:
+                listener(self, self.dt)
+            except Exception:
+                # Telemetry, history, safety and the watchdog share this tick; one
+                # failing listener must not starve the others or stop the loop
+                logging.exception(f"Tick listener {listener!r} failed")
+        self.ticks += 1
+        self.last_step_ms = (time.perf_counter() - started) * 1000.0
+
+    async def _loop(self):
+        # Fixed-step loop scheduled against absolute clock deadlines so ticks do not drift
+        clock = self.clock
+        next_tick = clock.monotonic()
+        while self._running:
+            try:
+                self.tick()
+            except Exception:
+                # This is the only fleet task: log and keep ticking rather than freeze every robot
+                logging.exception("Fleet tick failed")
+            next_tick += self.dt
+            # A sped-up clock asks for many ticks per real tick interval; late ticks
+            # run back to back until the simulation is this far behind
+            if clock.monotonic() - next_tick > self.dt * min(clock.rate, MAX_CATCH_UP_TICKS):
+                # Overran the tick budget; skip ahead instead of trying to catch up
+                self.overruns += 1
+                next_tick = clock.monotonic()
+            await clock.sleep_until(next_tick)
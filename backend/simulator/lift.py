@@ -0,0 +1,78 @@
+from typing import Tuple
+
+import numpy as np
+
+# Lift travel and motion limits; moves follow a trapezoidal velocity profile
+LIFT_MIN_CM = 0.0
+LIFT_MAX_CM = 200.0
+LIFT_MAX_SPEED_CM_S = 10.0
+LIFT_MAX_ACCEL_CM_S2 = 20.0
+# Within this distance (and slow enough to stop in one tick) the lift has arrived
+LIFT_SETTLE_CM = 0.05
+
+# RobotService.set_lift commands: "set" is absolute, "up"/"down" jog relative to the current target
+LIFT_COMMANDS = ("set", "up", "down")
+
+
+def lift_target(command: str, height_cm: float, current_target: float) -> float:
+    """New lift target for a set/up/down command, clamped to the travel limits"""
+    if command == "up":
+        target = current_target + height_cm
+    elif command == "down":
+        target = current_target - height_cm
+    else:
+        target = height_cm
+    return min(max(target, LIFT_MIN_CM), LIFT_MAX_CM)
+
+
+def lift_step(position, velocity, target, dt: float,
+              max_speed: float = LIFT_MAX_SPEED_CM_S,
+              max_accel: float = LIFT_MAX_ACCEL_CM_S2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Advance lifts by dt towards their targets; works on arrays (the fleet) and scalars
+
+    Velocity ramps at max_accel up to max_speed, and ramps down again so the
+    lift stops on the target (a triangle instead of a trapezoid for short
+    moves). Returns (position, velocity, arrived), where arrived marks lifts
+    that were moving and settled on their target during this step.
+    """
+    error = target - position
+    direction = np.sign(error)
+    # Fastest speed from which the lift can still stop at the target
+    wanted = direction * np.minimum(max_speed, np.sqrt(2.0 * max_accel * np.abs(error)))
+    dv = max_accel * dt
+    new_velocity = velocity + np.clip(wanted - velocity, -dv, dv)
+    new_position = position + (velocity + new_velocity) * 0.5 * dt
+
+    moving = (error != 0) | (velocity != 0)
+    overshot = np.sign(target - new_position) != direction
+    settled = overshot | ((np.abs(target - new_position) <= LIFT_SETTLE_CM) & (np.abs(new_velocity) <= dv))
+    new_position = np.where(settled, target, new_position)
+    new_velocity = np.where(settled, 0.0, new_velocity)
+    return new_position, new_velocity, moving & settled
+
+
+class LiftActuator:
+    """One lift advanced by the owner's tick (single-robot simulators)"""
+
+    def __init__(self, height_cm: float = LIFT_MIN_CM):
+        self.height = height_cm
+        self.velocity = 0.0
+        self.target = height_cm
+
+    @property
+    def moving(self) -> bool:
+        return self.height != self.target or self.velocity != 0.0
+
+    def command(self, command: str, height_cm: float):
+        self.target = lift_target(command, height_cm, self.target)
+
+    def halt(self):
+        """Stop where the lift is now"""
+        self.target = self.height
+        self.velocity = 0.0
+
+    def step(self, dt: float) -> bool:
+        """Advance by dt seconds; returns True when the lift arrived at its target"""
+        height, velocity, arrived = lift_step(self.height, self.velocity, self.target, dt)
+        self.height, self.velocity = float(height), float(velocity)
+        return bool(arrived)
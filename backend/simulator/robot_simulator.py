@@ -1,16 +1,36 @@
 import asyncio
+from typing import Callable, Optional
 from backend.models.robot_state import RobotState, RobotStatus, RobotPosition
+from backend.simulator.clock import Clock, sim_clock
+from backend.simulator.lift import LiftActuator
+from backend.services.telemetry_service import TelemetryHub
+
+# Simulation tick; the rates below are per second and scaled by the tick length
+TICK_INTERVAL = 0.1
+BATTERY_DRAIN_PER_S = 0.1
+MOVE_SPEED = 0.1  # Units per second along each axis
 
 class RobotSimulator:
-    def __init__(self):
+    def __init__(self, telemetry: Optional[TelemetryHub] = None, clock: Clock = sim_clock):
         self.state = RobotState(
             status=RobotStatus.IDLE,
             position=RobotPosition(x=0.0, y=0.0, theta=0.0),
             battery_level=100.0
         )
+        self.telemetry = telemetry
+        self.clock = clock
+        self.speed = 0.0
+        self.turn_rate = 0.0
+        self.lift = LiftActuator()
+        # Called with the settled height when a lift move completes
+        self.on_lift_arrived: Optional[Callable[[float], None]] = None
+        # Called after every status change instead of publishing the bare simulator state
+        self.on_status_changed: Optional[Callable[[], None]] = None
         self._running = False
 
     async def start(self):
+        if self._running:
+            return  # Already ticking; never run two loops on one state
         self._running = True
         asyncio.create_task(self._loop())
 
@@ -21,17 +41,57 @@ class RobotSimulator:
         while self._running:
             # Simulate battery drain
             if self.state.battery_level > 0:
-                self.state.battery_level -= 0.1
-            
+                self.state.battery_level -= BATTERY_DRAIN_PER_S * TICK_INTERVAL
+
             # Simulate movement if status is MOVING (simplified)
             if self.state.status == RobotStatus.MOVING:
-                self.state.position.x += 0.1
-                self.state.position.y += 0.1
+                self.state.position.x += MOVE_SPEED * TICK_INTERVAL
+                self.state.position.y += MOVE_SPEED * TICK_INTERVAL
+
+            if self.lift.moving:
+                arrived = self.lift.step(TICK_INTERVAL)
+                self.state.lift_height = self.lift.height
+                if arrived and self.on_lift_arrived is not None:
+                    self.on_lift_arrived(self.lift.height)
 
-            await asyncio.sleep(1)
+            self._publish()
+            await self.clock.sleep(TICK_INTERVAL)
+
+    def _publish(self):
+        if self.telemetry is not None:
+            self.telemetry.publish(self.state)
 
     def get_state(self) -> RobotState:
         return self.state
 
+    def set_speed(self, speed: float):
+        self.speed = speed
+        self.state.speed = speed
+
+    def set_turn_rate(self, turn_rate: float):
+        self.turn_rate = turn_rate
+
+    def command_lift(self, command: str, height_cm: float):
+        """Start a set/up/down lift move; the tick loop carries it out"""
+        self.lift.command(command, height_cm)
+        self.state.lift_target = self.lift.target
+
+    def halt_lift(self):
+        self.lift.halt()
+        self.state.lift_target = self.lift.target
+
+    @property
+    def lift_height(self) -> float:
+        return self.lift.height
+
+    @property
+    def lift_moving(self) -> bool:
+        return self.lift.moving
+
     def update_status(self, status: RobotStatus):
         self.state.status = status
+        # Push status changes right away instead of waiting for the next tick
+        if self.on_status_changed is not None:
+            self.on_status_changed()
+        else:
+            self._publish()
@@ -1,16 +1,25 @@
 import math
-import time
+from typing import Callable, Optional
 from backend.models.models import RobotStateModel, RobotState
+from backend.simulator.clock import Clock, sim_clock
+from backend.simulator.lift import LiftActuator
+
+# update() integrates the lift in steps no longer than this, however long since the last call
+LIFT_MAX_STEP_S = 0.02
 
 class RobotSimulator:
-    def __init__(self):
+    def __init__(self, clock: Clock = sim_clock):
         self.state = RobotStateModel()
+        self.clock = clock
         self.target_speed = 0.0
         self.target_turn_speed = 0.0
-        self.last_update = time.time()
+        self.lift = LiftActuator(self.state.lift_height)
+        # Called with the settled height when a lift move completes
+        self.on_lift_arrived: Optional[Callable[[float], None]] = None
+        self.last_update = clock.monotonic()
 
     def update(self):
-        current_time = time.time()
+        current_time = self.clock.monotonic()
         dt = current_time - self.last_update
         self.last_update = current_time
 
@@ -22,6 +31,19 @@ class RobotSimulator:
         elif self.state.state == RobotState.TURNING:
             self.state.angle += self.target_turn_speed * dt
 
+        self._update_lift(dt)
+
+    def _update_lift(self, dt: float):
+        while self.lift.moving and dt > 0:
+            step = min(dt, LIFT_MAX_STEP_S)
+            dt -= step
+            if self.lift.step(step):
+                if self.state.state == RobotState.LIFT_MOVING:
+                    self.state.state = RobotState.IDLE
+                if self.on_lift_arrived is not None:
+                    self.on_lift_arrived(self.lift.height)
+        self.state.lift_height = self.lift.height
+
     def set_speed(self, speed: float):
         self.target_speed = speed
         if speed == 0:
@@ -39,26 +61,22 @@ class RobotSimulator:
             self.state.state = RobotState.TURNING
 
     def set_lift_height(self, height: float, command: str = "set"):
-        # Simple simulation: if command is up/down, we might increment/decrement
-        # For now, we'll just respect the height if command is "set" or ignore logic for up/down to keep it simple
-        # or we can interpret up/down as moving to max/min.
-        # Let's just set the height for now as the prompt implies direct control or we can refine.
-        # The prompt asked for {command, height}, so let's assume 'set' uses height, 'up'/'down' might use a fixed step or target.
-        # For simplicity in this iteration:
-        self.state.lift_height = height
-        self.state.state = RobotState.LIFT_MOVING
-        # Simulate move time
-        time.sleep(0.5) 
-        self.state.state = RobotState.IDLE
+        """Start a lift move and return at once; "up"/"down" jog by height from the current target"""
+        self.update()
+        self.lift.command(command, height)
+        if self.lift.moving:
+            self.state.state = RobotState.LIFT_MOVING
 
     def stop(self):
         self.target_speed = 0.0
         self.target_turn_speed = 0.0
+        self.lift.halt()
         self.state.state = RobotState.IDLE
 
     def emergency_stop(self):
         self.target_speed = 0.0
         self.target_turn_speed = 0.0
+        self.lift.halt()
         self.state.state = RobotState.EMERGENCY_STOP
 
     def get_state(self) -> RobotStateModel:
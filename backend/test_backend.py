@@ -17,19 +17,28 @@ def test_backend():
         print(f"Failed to get status: {e}")
         return
 
-    # 2. Move Robot
+    # 2. Log in (motion commands need a session token; uses a seeded user)
     try:
-        response = requests.post(f"{BASE_URL}/commands/move", params={"x": 1.0, "y": 1.0})
+        response = requests.post(f"{BASE_URL}/auth/login", json={"username": "operator", "password": "op123"})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    except Exception as e:
+        print(f"Failed to log in: {e}")
+        return
+
+    # 3. Move Robot
+    try:
+        response = requests.post(f"{BASE_URL}/commands/move", params={"x": 1.0, "y": 1.0}, headers=headers)
         response.raise_for_status()
         print(f"Move Command Response: {response.json()}")
     except Exception as e:
         print(f"Failed to send move command: {e}")
         return
 
-    # 3. Wait for simulator update
-    time.sleep(2)
+    # 4. Wait for simulator update (less than the 2 s command watchdog, which would stop the robot)
+    time.sleep(1)
 
-    # 4. Get Updated Status
+    # 5. Get Updated Status
     try:
         response = requests.get(f"{BASE_URL}/commands/status")
         response.raise_for_status()
@@ -41,7 +50,7 @@ def test_backend():
         print(f"Failed to get updated status: {e}")
         return
 
-    # 5. Stop Robot
+    # 6. Stop Robot
     try:
         response = requests.post(f"{BASE_URL}/commands/stop")
         response.raise_for_status()
@@ -50,7 +59,7 @@ def test_backend():
         print(f"Failed to send stop command: {e}")
         return
         
-    # 6. Final Status
+    # 7. Final Status
     try:
         response = requests.get(f"{BASE_URL}/commands/status")
         response.raise_for_status()
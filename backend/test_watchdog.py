@@ -0,0 +1,43 @@
+import asyncio
+
+from backend.services.fleet_registry import FleetRegistry
+from backend.simulator.clock import ScaledClock
+from backend.simulator.fleet_simulator import FleetSimulator
+
+KEEPALIVE_S = 0.5  # Same as the UI's joystick keepalive (ui/src/App.jsx)
+
+
+async def drive_on_scaled_clock():
+    # A sped-up simulation must not shrink the operator timeout: it is 2 s of real time
+    clock = ScaledClock(100)
+    registry = FleetRegistry(fleet=FleetSimulator(clock=clock))
+    robot = registry.register("robot-1")
+    await registry.start()
+    try:
+        # 3 s of keepalives (300 simulated seconds): the robot keeps moving
+        for _ in range(6):
+            assert robot.scheduler.submit("move", 0.5)
+            await asyncio.sleep(KEEPALIVE_S)
+        state = robot.get_state()
+        print(f"While driving: {state.status.value}, {registry.watchdog.stops} watchdog stops")
+        assert state.status.value == "MOVING"
+        assert registry.watchdog.stops == 0
+
+        # The operator goes quiet for longer than the timeout: the watchdog stops the robot
+        await asyncio.sleep(registry.watchdog.timeout_s + 0.5)
+        state = robot.get_state()
+        print(f"After going quiet: {state.status.value}, {registry.watchdog.stops} watchdog stops")
+        assert state.status.value == "IDLE"
+        assert registry.watchdog.stops == 1
+    finally:
+        await registry.stop()
+
+
+def test_watchdog_scaled_clock():
+    print("Testing the command watchdog under SIM_CLOCK=scaled:100...")
+    asyncio.run(drive_on_scaled_clock())
+    print("Watchdog Tests Passed!")
+
+
+if __name__ == "__main__":
+    test_watchdog_scaled_clock()
@@ -1,29 +1,127 @@
+// Generated from backend/services/state_machine.py; do not edit by hand.
+// Regenerate with: python -m backend.services.state_machine
 #pragma once
 
-enum class RobotState {
-  IDLE,
-  MOVING,
-  TURNING,
-  LIFT_MOVING,
-  ERROR,
-  EMERGENCY_STOP
+#include <stdint.h>
+
+enum class RobotState : uint8_t {
+  IDLE = 0,
+  MOVING = 1,
+  TURNING = 2,
+  LIFT_MOVING = 3,
+  ERROR = 4,
+  EMERGENCY_STOP = 5,
+  CHARGING = 6,
 };
+static constexpr uint8_t kRobotStateCount = 7;
 
-class RobotStateMachine {
-private:
-  RobotState currentState;
+enum class RobotEvent : uint8_t {
+  MOVE = 0,
+  TURN = 1,
+  LIFT = 2,
+  STOP = 3,
+  CHARGE = 4,
+  FAULT = 5,
+  EMERGENCY_STOP = 6,
+  RESET = 7,
+};
 
+// Guard 0 means the transition is unconditional
+enum class RobotGuard : uint8_t {
+  NONE = 0,
+  BATTERY_OK = 1,
+};
+static constexpr uint8_t kRobotGuardCount = 2;
+
+struct RobotTransition {
+  RobotState from;
+  RobotState to;
+  RobotEvent event;
+  RobotGuard guard;
+};
+
+// One entry per allowed (from, to) pair; kRobotTransitionTable holds their index
+static constexpr RobotTransition kRobotTransitions[] = {
+  {RobotState::IDLE, RobotState::MOVING, RobotEvent::MOVE, RobotGuard::BATTERY_OK},
+  {RobotState::IDLE, RobotState::TURNING, RobotEvent::TURN, RobotGuard::BATTERY_OK},
+  {RobotState::IDLE, RobotState::LIFT_MOVING, RobotEvent::LIFT, RobotGuard::BATTERY_OK},
+  {RobotState::IDLE, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::IDLE, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+  {RobotState::IDLE, RobotState::CHARGING, RobotEvent::CHARGE, RobotGuard::NONE},
+  {RobotState::MOVING, RobotState::IDLE, RobotEvent::STOP, RobotGuard::NONE},
+  {RobotState::MOVING, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::MOVING, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+  {RobotState::TURNING, RobotState::IDLE, RobotEvent::STOP, RobotGuard::NONE},
+  {RobotState::TURNING, RobotState::MOVING, RobotEvent::MOVE, RobotGuard::BATTERY_OK},
+  {RobotState::TURNING, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::TURNING, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+  {RobotState::LIFT_MOVING, RobotState::IDLE, RobotEvent::STOP, RobotGuard::NONE},
+  {RobotState::LIFT_MOVING, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::LIFT_MOVING, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+  {RobotState::ERROR, RobotState::IDLE, RobotEvent::RESET, RobotGuard::NONE},
+  {RobotState::ERROR, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+  {RobotState::EMERGENCY_STOP, RobotState::IDLE, RobotEvent::RESET, RobotGuard::NONE},
+  {RobotState::EMERGENCY_STOP, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::CHARGING, RobotState::IDLE, RobotEvent::STOP, RobotGuard::NONE},
+  {RobotState::CHARGING, RobotState::ERROR, RobotEvent::FAULT, RobotGuard::NONE},
+  {RobotState::CHARGING, RobotState::EMERGENCY_STOP, RobotEvent::EMERGENCY_STOP, RobotGuard::NONE},
+};
+
+// kRobotTransitionTable[from][to]: index into kRobotTransitions, -1 if not allowed
+static constexpr int8_t kRobotTransitionTable[kRobotStateCount][kRobotStateCount] = {
+  // Columns: IDLE, MOVING, TURNING, LIFT_MOVING, ERROR, EMERGENCY_STOP, CHARGING
+  { -1,   0,   1,   2,   3,   4,   5},  // IDLE
+  {  6,  -1,  -1,  -1,   7,   8,  -1},  // MOVING
+  {  9,  10,  -1,  -1,  11,  12,  -1},  // TURNING
+  { 13,  -1,  -1,  -1,  14,  15,  -1},  // LIFT_MOVING
+  { 16,  -1,  -1,  -1,  -1,  17,  -1},  // ERROR
+  { 18,  -1,  -1,  -1,  19,  -1,  -1},  // EMERGENCY_STOP
+  { 20,  -1,  -1,  -1,  21,  22,  -1},  // CHARGING
+};
+
+class RobotStateMachine {
 public:
-  RobotStateMachine() : currentState(RobotState::IDLE) {}
+  // guard(context) -> whether the transition may happen now
+  using GuardFn = bool (*)(void *context);
+  // hook(from, to, context), run on leaving / entering a state
+  using HookFn = void (*)(RobotState from, RobotState to, void *context);
+
+  explicit RobotStateMachine(void *context = nullptr)
+      : currentState(RobotState::IDLE), context(context), guards(), onEnter(), onExit() {}
 
   RobotState getState() const { return currentState; }
 
-  void transition(RobotState newState) {
-    // Add validation logic here if needed
+  void setGuard(RobotGuard guard, GuardFn fn) { guards[static_cast<uint8_t>(guard)] = fn; }
+  void setOnEnter(RobotState state, HookFn fn) { onEnter[static_cast<uint8_t>(state)] = fn; }
+  void setOnExit(RobotState state, HookFn fn) { onExit[static_cast<uint8_t>(state)] = fn; }
+
+  // Unbound guards allow the transition; staying in the current state is not a transition
+  bool transition(RobotState newState) {
+    const uint8_t from = static_cast<uint8_t>(currentState);
+    const uint8_t to = static_cast<uint8_t>(newState);
+    const int8_t id = kRobotTransitionTable[from][to];
+    if (id < 0) {
+      return false;
+    }
+    const GuardFn guard = guards[static_cast<uint8_t>(kRobotTransitions[id].guard)];
+    if (guard != nullptr && !guard(context)) {
+      return false;
+    }
+    const RobotState oldState = currentState;
+    if (onExit[from] != nullptr) {
+      onExit[from](oldState, newState, context);
+    }
     currentState = newState;
+    if (onEnter[to] != nullptr) {
+      onEnter[to](oldState, newState, context);
+    }
+    return true;
   }
 
-  void update() {
-    // State machine logic loop
-  }
+private:
+  RobotState currentState;
+  void *context;
+  GuardFn guards[kRobotGuardCount];
+  HookFn onEnter[kRobotStateCount];
+  HookFn onExit[kRobotStateCount];
 };
@@ -78,7 +78,10 @@ def run_commands():
         "sqlalchemy",
         "bcrypt",
         "passlib",
-        "email_validator"
+        "email_validator",
+        "numpy",
+        "aiosqlite",
+        "greenlet"
     ])
     ui_ready = ensure_ui_deps(npm_cmd)
     if not (python_ready and ui_ready):
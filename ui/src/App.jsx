@@ -14,6 +14,10 @@ import SimpleSlider from './components/react-bits/SimpleSlider';
 import { API_URL } from './config';
 import './App.css';
 
+const TELEMETRY_HZ = 5;
+// The backend watchdog stops a robot after 2 s without commands; held controls repeat faster
+const KEEPALIVE_MS = 500;
+
 const userProfile = {
   name: 'Alex Contractor',
   robots: [
@@ -174,8 +178,51 @@ function App() {
   useEffect(() => {
     setConnectionStatus('scanning');
     fetchStatus();
-    const interval = setInterval(fetchStatus, 1200);
-    return () => clearInterval(interval);
+
+    // Live telemetry: WebSocket first, Server-Sent Events as a fallback.
+    // Frames carry only the fields that changed, so merge them into the last state.
+    let fields = {};
+    let socket = null;
+    let eventSource = null;
+    let closed = false;
+
+    const applyFrame = (raw) => {
+      const frame = JSON.parse(raw);
+      fields = frame.full ? frame.fields : { ...fields, ...frame.fields };
+      setStatus({
+        status: fields.status,
+        position: { x: fields.x, y: fields.y, theta: fields.theta },
+        battery_level: fields.battery_level,
+        lift_height: fields.lift_height,
+        lift_target: fields.lift_target,
+        error_message: fields.error_message,
+      });
+      setConnectionStatus('connected');
+    };
+
+    const openEventSource = () => {
+      if (closed) return;
+      eventSource = new EventSource(`${API_URL}/telemetry/stream?hz=${TELEMETRY_HZ}`);
+      eventSource.onmessage = (event) => applyFrame(event.data);
+      eventSource.onerror = () => setConnectionStatus('scanning');
+    };
+
+    try {
+      socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/telemetry?hz=${TELEMETRY_HZ}`);
+      socket.onmessage = (event) => applyFrame(event.data);
+      socket.onerror = () => {
+        socket.close();
+        openEventSource();
+      };
+    } catch (err) {
+      openEventSource();
+    }
+
+    return () => {
+      closed = true;
+      if (socket) socket.close();
+      if (eventSource) eventSource.close();
+    };
   }, [selectedRobotId]);
 
   const fetchStatus = async () => {
@@ -199,10 +246,12 @@ function App() {
     try {
       await fetch(`${API_URL}${endpoint}`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${user?.access_token}`,
+        },
         body: JSON.stringify(body),
       });
-      fetchStatus();
     } catch (err) {
       console.error(`Failed to send ${endpoint}`, err);
       setConnectionStatus('scanning');
@@ -265,6 +314,18 @@ function App() {
     }
   };
 
+  // Repeat whatever the operator is holding so the watchdog sees a live operator
+  useEffect(() => {
+    if (mode === 'auto') return undefined;
+    const timer = setInterval(() => {
+      const speed = Math.abs(joystickY) > 0.05 ? -joystickY : throttle;
+      const turn = Math.abs(joystickX) > 0.05 ? joystickX : steering;
+      if (Math.abs(speed) >= 0.05) sendCommand('/move', { speed });
+      if (Math.abs(turn) >= 0.05) sendCommand('/turn', { speed: turn });
+    }, KEEPALIVE_MS);
+    return () => clearInterval(timer);
+  }, [mode, throttle, steering, joystickX, joystickY]);
+
   const handleJoystickRelease = () => {
     if (mode === 'auto') return;
     setJoystickX(0);
@@ -297,7 +358,10 @@ function App() {
     try {
       await fetch(`${API_URL}/arm`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${user?.access_token}`,
+        },
         body: JSON.stringify({ direction }),
       });
       fetchStatus();
@@ -552,6 +616,12 @@ function App() {
                 <span className="label">Y</span>
                 <span className="value">{status ? status.position.y.toFixed(2) : 'no connection'}</span>
               </div>
+              <div>
+                <span className="label">Lift</span>
+                <span className="value">
+                  {status ? `${(status.lift_height ?? 0).toFixed(1)} / ${(status.lift_target ?? 0).toFixed(1)} cm` : 'no connection'}
+                </span>
+              </div>
               <div>
                 <span className="label">Arm Height</span>
                 <span className="value">{status ? (status.arm_height?.toFixed(2) || '0.00') : 'no connection'}</span>
@@ -270,9 +270,19 @@ export default function ProjectDetailPage() {
               {project.floor_plan_files.map((file, idx) => (
                 <div key={`file-${idx}`} className="floor-plan-file-item">
                   <div className="file-info">
-                    <span className="file-icon">
-                      {file.file_type === 'pdf' ? '📄' : '📐'}
-                    </span>
+                    {file.derivatives_status === 'ready' ? (
+                      <img
+                        className="file-thumbnail"
+                        src={`${API_URL}/floor-plans/${file.id}/thumbnail`}
+                        alt={`${file.filename} preview`}
+                        loading="lazy"
+                        width={80}
+                      />
+                    ) : (
+                      <span className="file-icon">
+                        {file.file_type === 'pdf' ? '📄' : '📐'}
+                      </span>
+                    )}
                     <div className="file-details">
                       <div className="file-name">{file.filename}</div>
                       <div className="file-meta">
@@ -288,7 +298,11 @@ export default function ProjectDetailPage() {
                     </div>
                   </div>
                   <a
-                    href={`${API_URL}/projects/${id}/floor-plans/${idx}/download`}
+                    href={
+                      file.id != null
+                        ? `${API_URL}/floor-plans/${file.id}/download`
+                        : `${API_URL}/projects/${id}/floor-plans/${idx}/download`
+                    }
                     className="download-button"
                     download
                   >
@@ -12,22 +12,65 @@ export default function ProjectsPage() {
   const navigate = useNavigate();
   const [projects, setProjects] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
+  const [query, setQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
 
   useEffect(() => {
     fetchProjects();
   }, []);
 
+  // Type-ahead search runs server-side; debounce so each pause sends one request
+  useEffect(() => {
+    const q = query.trim();
+    if (!q) {
+      setSearchResults(null);
+      return undefined;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`${API_URL}/projects/search?q=${encodeURIComponent(q)}&limit=50`, {
+          signal: controller.signal,
+        });
+        if (!res.ok) {
+          throw new Error('Search failed');
+        }
+        setSearchResults(await res.json());
+      } catch (err) {
+        if (err.name !== 'AbortError') {
+          console.error(err);
+          setError('Search is unavailable right now.');
+        }
+      }
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query]);
+
+  const visibleProjects = searchResults ?? projects;
+
+  // The API pages its results: load the first page, then one more per "Load more"
+  const fetchPage = async (cursor) => {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const res = await fetch(`${API_URL}/projects${query}`);
+    if (!res.ok) {
+      throw new Error('Failed to fetch projects');
+    }
+    const page = await res.json();
+    setNextCursor(res.headers.get('X-Next-Cursor'));
+    return page;
+  };
+
   const fetchProjects = async () => {
     setLoading(true);
     setError('');
     try {
-      const res = await fetch(`${API_URL}/projects`);
-      if (!res.ok) {
-        throw new Error('Failed to fetch projects');
-      }
-      const data = await res.json();
-      setProjects(data);
+      setProjects(await fetchPage(null));
     } catch (err) {
       console.error(err);
       setError('Could not load projects right now.');
@@ -36,6 +79,20 @@ export default function ProjectsPage() {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    setError('');
+    try {
+      const page = await fetchPage(nextCursor);
+      setProjects((prev) => [...prev, ...page]);
+    } catch (err) {
+      console.error(err);
+      setError('Could not load more projects right now.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
 
   const toggleCompleted = async (projectId, completed) => {
     setError('');
@@ -97,8 +154,18 @@ export default function ProjectsPage() {
           >
             New Project
           </AnimatedButton>
+          <input
+            type="search"
+            className="project-search"
+            placeholder="Search title, address or notes…"
+            value={query}
+            onChange={(e) => setQuery(e.target.value)}
+          />
           <div className="project-tally">
-            <span className="pill neutral">Total {projectSummary.total}</span>
+            <span className="pill neutral">
+              Total {projectSummary.total}
+              {nextCursor ? '+' : ''}
+            </span>
             <span className="pill success">Ready {projectSummary.completed}</span>
           </div>
         </div>
@@ -110,6 +177,10 @@ export default function ProjectsPage() {
             <LoadingSpinner size="medium" />
             <p style={{ marginTop: '16px' }}>Loading projects…</p>
           </div>
+        ) : searchResults && searchResults.length === 0 ? (
+          <div className="projects-empty">
+            <p>No projects match "{query.trim()}".</p>
+          </div>
         ) : projects.length === 0 ? (
           <div className="projects-empty">
             <p>No projects yet.</p>
@@ -129,7 +200,7 @@ export default function ProjectsPage() {
                 </tr>
               </thead>
               <tbody>
-                {projects.map((project) => (
+                {visibleProjects.map((project) => (
                   <tr key={project.id} className={`table-row ${project.completed ? 'completed' : ''}`}>
                     <td className="table-col-checkbox">
                       <label className="table-checkbox">
@@ -189,6 +260,18 @@ export default function ProjectsPage() {
                 ))}
               </tbody>
             </table>
+            {!searchResults && nextCursor && (
+              <div className="projects-load-more">
+                <AnimatedButton
+                  variant="secondary"
+                  size="medium"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Loading…' : 'Load more'}
+                </AnimatedButton>
+              </div>
+            )}
           </div>
         )}
       </SpotlightCard>
@@ -83,7 +83,7 @@ export default function UserSettingsPage() {
       const userData = JSON.parse(storedUser);
       const res = await fetch(`${API_URL}/users/me`, {
         headers: {
-          'X-User-Id': userData.id?.toString() || '1',
+          Authorization: `Bearer ${userData.access_token}`,
         },
       });
 
@@ -125,7 +125,7 @@ export default function UserSettingsPage() {
         method: 'PATCH',
         headers: {
           'Content-Type': 'application/json',
-          'X-User-Id': userData.id?.toString() || '1',
+          Authorization: `Bearer ${userData.access_token}`,
         },
         body: JSON.stringify(formData),
       });